@@ -0,0 +1,517 @@
+"""
+Motor analítico em memória para o dashboard e os relatórios
+A tabela grades é lida uma vez e agregada em matrizes NumPy (aluno × matéria)
+com a soma das notas em décimos e a quantidade de notas; médias, status,
+taxas de aprovação e quebras por turma saem de operações vetorizadas sobre
+essas matrizes. As escritas dos modelos aplicam a variação de cada célula
+(como Grade.update_summary faz em student_subject_stats), sem recarregar.
+
+Sem NumPy (ou com ANALYTICS_ENGINE=0) os modelos continuam usando as
+consultas SQL de sempre.
+"""
+
+import os
+import threading
+import time
+from array import array
+from dotenv import load_dotenv
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+# Mesmos limites de Grade.status_for (em décimos de ponto)
+PASS_TENTHS = 60
+RECOVERY_TENTHS = 40
+
+
+def divide(numerator_tenths, count, digits):
+    """Divisão de somas em décimos por quantidades, arredondada (meio para cima)
+    em `digits` casas como a aritmética DECIMAL do MySQL. Retorna inteiros
+    escalados por 10 ** digits (0 onde count é 0)."""
+    scale = 10 ** (digits - 1)
+    safe = np.maximum(count, 1)
+    return np.where(count > 0, (2 * numerator_tenths * scale + safe) // (2 * safe), 0)
+
+
+class AnalyticsEngine:
+    """Agregados de notas por aluno × matéria mantidos em memória"""
+
+    def __init__(self, max_age=None):
+        self.enabled = np is not None and os.getenv('ANALYTICS_ENGINE', '1') != '0'
+        # Recarga periódica de segurança; escritas de outros processos são
+        # detectadas pelas versões das tabelas (data_versions), lidas no máximo
+        # a cada version_ttl segundos
+        self.max_age = max_age or int(os.getenv('ANALYTICS_MAX_AGE', 300))
+        self.version_ttl = float(os.getenv('DATA_VERSION_TTL', 1))
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded_at = None
+        self._stale = True
+        self._writes = 0
+        self._versions = None
+        self._versions_checked = 0
+        self._round_1 = None
+        self._stats = {
+            'loads': 0,
+            'load_ms': 0,
+            'grades_loaded': 0,
+            'increments': 0
+        }
+
+        # Matérias (na ordem de ORDER BY name)
+        self._subjects = []
+        self._subject_index = {}
+        self._min_tenths = None
+
+        # Alunos: uma linha por aluno, com capacidade extra para novos cadastros
+        self._student_index = {}
+        self._student_ids = None
+        self._names = []
+        self._class_codes = None
+        self._class_names = []
+        self._class_index = {}
+        self._active = None
+        self._order = None
+        self._size = 0
+
+        # Células aluno × matéria: soma das notas (décimos) e quantidade de notas
+        self._sums = None
+        self._counts = None
+
+    # ---------- carga ----------
+
+    def ensure_loaded(self, db):
+        """Carrega (ou recarrega, se obsoleto) os dados; False se o motor estiver desligado"""
+        if not self.enabled or not db:
+            return False
+
+        expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+        if not (self._stale or expired) and self._changed_elsewhere(db):
+            with self._lock:
+                self._stale = True
+        if self._stale or expired:
+            with self._load_lock:
+                expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age
+                if self._stale or expired:
+                    self.load(db)
+        if self._order is None:
+            self._load_order(db)
+        return True
+
+    @staticmethod
+    def _read_versions(db):
+        # Versões do banco e, depois, as confirmadas por este processo (nessa
+        # ordem: uma escrita local entre as duas leituras só causa uma recarga a mais)
+        with db.use_primary():
+            versions = db.data_versions()
+        return None if versions is None else (versions, db.own_versions())
+
+    def _changed_elsewhere(self, db):
+        """Indica se outro processo (worker, script) escreveu desde a carga: a versão
+        de alguma tabela avançou mais do que as escritas confirmadas aqui"""
+        if self._versions is None or time.monotonic() - self._versions_checked < self.version_ttl:
+            return False
+        self._versions_checked = time.monotonic()
+        current = self._read_versions(db)
+        if current is None:
+            return False
+        (loaded, loaded_own), (versions, own) = self._versions, current
+        return any(
+            versions[table][0] - loaded.get(table, (0, 0))[0] > own.get(table, 0) - loaded_own.get(table, 0)
+            for table in versions
+        )
+
+    def load(self, db):
+        """Lê matérias, alunos e notas do primário e monta as matrizes"""
+        started = time.perf_counter()
+        writes = self._writes
+        versions = self._read_versions(db)
+
+        with db.use_primary():
+            subjects = db.fetch_query("SELECT id, name, teacher, min_grade FROM subjects ORDER BY name") or []
+            students = db.fetch_query("SELECT id, name, class FROM students ORDER BY name, id") or []
+
+            subject_index = {row['id']: code for code, row in enumerate(subjects)}
+            student_index = {row['id']: index for index, row in enumerate(students)}
+
+            # Colunas compactas: índice do aluno, código da matéria e nota em décimos
+            student_column = array('l')
+            subject_column = array('h')
+            grade_column = array('l')
+            for row in db.iter_query("SELECT student_id, subject_id, grade FROM grades", batch_size=5000):
+                index = student_index.get(row['student_id'])
+                code = subject_index.get(row['subject_id'])
+                if index is None or code is None:
+                    continue
+                student_column.append(index)
+                subject_column.append(code)
+                grade_column.append(int(round(row['grade'] * 10)))
+
+        width = max(len(subjects), 1)
+        capacity = max(len(students) * 2, 64)
+        cells = np.asarray(student_column, dtype=np.int64) * width + np.asarray(subject_column, dtype=np.int64)
+        grades = np.asarray(grade_column, dtype=np.int64)
+
+        sums = np.zeros((capacity, width), dtype=np.int64)
+        counts = np.zeros((capacity, width), dtype=np.int64)
+        used = len(students) * width
+        sums.reshape(-1)[:used] = np.bincount(cells, weights=grades, minlength=used)[:used].astype(np.int64)
+        counts.reshape(-1)[:used] = np.bincount(cells, minlength=used)[:used]
+
+        class_index = {}
+        class_codes = np.zeros(capacity, dtype=np.int32)
+        for index, row in enumerate(students):
+            class_codes[index] = class_index.setdefault(row['class'], len(class_index))
+
+        student_ids = np.zeros(capacity, dtype=np.int64)
+        student_ids[:len(students)] = [row['id'] for row in students]
+        active = np.zeros(capacity, dtype=bool)
+        active[:len(students)] = True
+
+        with self._lock:
+            self._subjects = [
+                {
+                    'id': row['id'],
+                    'name': row['name'],
+                    'teacher': row['teacher'],
+                    'min_grade': float(row['min_grade']) if row['min_grade'] is not None else 6.0
+                }
+                for row in subjects
+            ]
+            self._subject_index = subject_index
+            self._min_tenths = np.array([int(round(subject['min_grade'] * 10)) for subject in self._subjects] or [0],
+                                        dtype=np.int64)
+            self._student_index = student_index
+            self._student_ids = student_ids
+            self._names = [row['name'] for row in students]
+            self._class_codes = class_codes
+            self._class_names = list(class_index)
+            self._class_index = class_index
+            self._active = active
+            self._order = np.arange(len(students))
+            self._size = len(students)
+            self._sums = sums
+            self._counts = counts
+            self._loaded_at = time.monotonic()
+            self._versions = versions
+            self._versions_checked = self._loaded_at
+            # Escrita concorrente com a leitura: pode ter ficado de fora da carga
+            self._stale = self._writes != writes
+
+            self._stats['loads'] += 1
+            self._stats['load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            self._stats['grades_loaded'] = len(grades)
+
+    def _load_order(self, db):
+        """Refaz a ordem do relatório (name, id) pela collation do banco"""
+        rows = db.fetch_query("SELECT id FROM students ORDER BY name, id") or []
+        with self._lock:
+            order = [self._student_index[row['id']] for row in rows if row['id'] in self._student_index]
+            self._order = np.array(order, dtype=np.int64)
+
+    def mark_stale(self):
+        """Força a recarga completa na próxima leitura (ex.: importação em lote)"""
+        with self._lock:
+            self._writes += 1
+            self._stale = True
+
+    # ---------- atualizações incrementais ----------
+
+    def apply_grades(self, changes):
+        """Aplica variações (student_id, subject_id, delta da soma, delta da quantidade)
+        já gravadas no banco"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._writes += 1
+            if self._sums is None:
+                return
+            for student_id, subject_id, delta_sum, delta_count in changes:
+                index = self._student_index.get(student_id)
+                code = self._subject_index.get(subject_id)
+                if index is None or code is None:
+                    self._stale = True
+                    continue
+                self._sums[index, code] += int(round(delta_sum * 10))
+                self._counts[index, code] += delta_count
+                self._stats['increments'] += 1
+
+    def save_student(self, student_id, name, student_class):
+        """Registra um aluno novo ou os dados alterados de um aluno"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._writes += 1
+            if self._sums is None:
+                return
+            index = self._student_index.get(student_id)
+            if index is None:
+                if self._size == len(self._student_ids):
+                    self._grow()
+                index = self._size
+                self._size += 1
+                self._student_index[student_id] = index
+                self._student_ids[index] = student_id
+                self._names.append(name)
+                self._active[index] = True
+            else:
+                self._names[index] = name
+
+            code = self._class_index.get(student_class)
+            if code is None:
+                code = self._class_index[student_class] = len(self._class_names)
+                self._class_names.append(student_class)
+            self._class_codes[index] = code
+            # Nome novo ou alterado: a posição no relatório depende da collation
+            self._order = None
+            self._stats['increments'] += 1
+
+    def remove_student(self, student_id):
+        """Remove um aluno e suas notas (ON DELETE CASCADE)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._writes += 1
+            if self._sums is None:
+                return
+            index = self._student_index.pop(student_id, None)
+            if index is None:
+                return
+            self._active[index] = False
+            self._sums[index] = 0
+            self._counts[index] = 0
+            if self._order is not None:
+                self._order = self._order[self._order != index]
+            self._stats['increments'] += 1
+
+    def _grow(self):
+        def doubled(values):
+            return np.concatenate([values, np.zeros_like(values)])
+
+        self._student_ids = doubled(self._student_ids)
+        self._class_codes = doubled(self._class_codes)
+        self._active = doubled(self._active)
+        self._sums = doubled(self._sums)
+        self._counts = doubled(self._counts)
+
+    # ---------- consultas ----------
+
+    def _snapshot(self):
+        """Cópia consistente das matrizes (apenas as linhas em uso)"""
+        with self._lock:
+            size = self._size
+            return {
+                'subjects': list(self._subjects),
+                'min_tenths': self._min_tenths,
+                'ids': self._student_ids[:size].copy(),
+                'names': list(self._names),
+                'class_codes': self._class_codes[:size].copy(),
+                'class_names': list(self._class_names),
+                'active': self._active[:size].copy(),
+                'order': self._order.copy() if self._order is not None else np.flatnonzero(self._active[:size]),
+                'sums': self._sums[:size, :len(self._subjects)].copy(),
+                'counts': self._counts[:size, :len(self._subjects)].copy()
+            }
+
+    def _round_table(self):
+        """round(média, 1) para cada média com 4 casas (0,0000 a 10,0000), como no
+        relatório por aluno (mesmo arredondamento de float do Python)"""
+        if self._round_1 is None:
+            self._round_1 = np.array([round(value / 10000, 1) for value in range(100001)])
+        return self._round_1
+
+    @staticmethod
+    def _selected(data, student_class=None):
+        """Máscara dos alunos ativos (de uma turma, se informada)"""
+        if student_class is None:
+            return data['active']
+        if student_class not in data['class_names']:
+            return np.zeros_like(data['active'])
+        return data['active'] & (data['class_codes'] == data['class_names'].index(student_class))
+
+    @staticmethod
+    def _student_averages(data):
+        """Média geral por aluno (ROUND(SUM(grade_sum), 1) / SUM(grade_count)), com 5 casas"""
+        totals = data['sums'].sum(axis=1)
+        counts = data['counts'].sum(axis=1)
+        return divide(totals, counts, 5), counts
+
+    def dashboard_stats(self):
+        """Mesmo resultado de Dashboard.get_stats"""
+        data = self._snapshot()
+        averages, counts = self._student_averages(data)
+        graded = data['active'] & (counts > 0)
+        students_with_grades = int(graded.sum())
+
+        stats = {
+            'total_students': int(data['active'].sum()),
+            'total_subjects': len(data['subjects'])
+        }
+        if students_with_grades:
+            stats['passed_students'] = int((averages[graded] >= PASS_TENTHS * 10000).sum())
+            stats['average_grade'] = round(int(averages[graded].sum()) / 100000 / students_with_grades, 1)
+        else:
+            stats['passed_students'] = 0
+            stats['average_grade'] = 0
+        return stats
+
+    @staticmethod
+    def _classify(averages, mask, group=None, groups=1):
+        """Conta aprovados, em recuperação e reprovados (por grupo, se informado)"""
+        def count(selected):
+            selected = selected & mask
+            if group is None:
+                return np.array([int(selected.sum())])
+            return np.bincount(group[selected], minlength=groups)
+
+        approved = count(averages >= PASS_TENTHS * 10000)
+        recovery = count((averages < PASS_TENTHS * 10000) & (averages >= RECOVERY_TENTHS * 10000))
+        failed = count((averages < RECOVERY_TENTHS * 10000) & (averages > 0))
+        return approved, recovery, failed
+
+    def general_stats(self, student_class=None):
+        """Mesmo resultado de Reports.get_general_stats"""
+        data = self._snapshot()
+        selected = self._selected(data, student_class)
+        if not selected.any():
+            return {'approved': 0, 'failed': 0, 'recovery': 0, 'approval_rate': 0}
+
+        averages, _ = self._student_averages(data)
+        approved, recovery, failed = (int(value[0]) for value in self._classify(averages, selected))
+        total = approved + failed + recovery
+        return {
+            'approved': approved,
+            'failed': failed,
+            'recovery': recovery,
+            'approval_rate': round((approved / total) * 100, 1) if total > 0 else 0
+        }
+
+    def class_stats(self, student_class=None):
+        """Mesmo resultado de Reports.build_class_report (aprovação por turma)"""
+        data = self._snapshot()
+        groups = len(data['class_names'])
+        if not groups:
+            return []
+
+        averages, counts = self._student_averages(data)
+        codes = data['class_codes']
+        active = data['active']
+        graded = active & (counts > 0)
+
+        students = np.bincount(codes[active], minlength=groups)
+        with_grades = np.bincount(codes[graded], minlength=groups)
+        average_sums = np.bincount(codes[graded], weights=averages[graded], minlength=groups)
+        approved, recovery, failed = self._classify(averages, active, codes, groups)
+
+        report = []
+        for code in sorted(range(groups), key=lambda code: data['class_names'][code]):
+            if not students[code] or student_class not in (None, data['class_names'][code]):
+                continue
+            total = int(approved[code] + recovery[code] + failed[code])
+            report.append({
+                'class': data['class_names'][code],
+                'total_students': int(students[code]),
+                'students_with_grades': int(with_grades[code]),
+                'approved': int(approved[code]),
+                'failed': int(failed[code]),
+                'recovery': int(recovery[code]),
+                'approval_rate': round(int(approved[code]) / total * 100, 1) if total > 0 else 0,
+                'average_grade': round(int(average_sums[code]) / 100000 / int(with_grades[code]), 1) if with_grades[code] else 0
+            })
+        return report
+
+    def subject_stats(self, subject_id=None):
+        """Mesmo resultado de Subject.get_stats"""
+        data = self._snapshot()
+        sums, counts = data['sums'], data['counts']
+        graded = counts > 0
+        # Média de cada célula como guardada em student_subject_stats.average (4 casas)
+        cell_averages = divide(sums, counts, 4)
+        limits = data['min_tenths'][:len(data['subjects'])] * 1000
+
+        totals = graded.sum(axis=0)
+        approved = (graded & (cell_averages >= limits)).sum(axis=0)
+        recovery = (graded & (cell_averages < limits) & (cell_averages >= RECOVERY_TENTHS * 1000)).sum(axis=0)
+        failed = (graded & (cell_averages < limits) & (cell_averages < RECOVERY_TENTHS * 1000) & (cell_averages > 0)).sum(axis=0)
+        class_averages = divide(sums.sum(axis=0), counts.sum(axis=0), 5)
+
+        stats = []
+        for code, subject in enumerate(data['subjects']):
+            if subject_id and subject['id'] != subject_id:
+                continue
+            total = int(totals[code])
+            approval_rate = (int(approved[code]) / total * 100) if total > 0 else 0
+            stats.append({
+                **subject,
+                'total_students': total,
+                'approved': int(approved[code]),
+                'recovery': int(recovery[code]),
+                'failed': int(failed[code]),
+                'class_average': round(int(class_averages[code]) / 100000, 1),
+                'approval_rate': round(approval_rate, 1)
+            })
+        return stats
+
+    def iter_student_report(self, student_class=None):
+        """Mesmo resultado de Reports.iter_student_report (ordem name, id)"""
+        data = self._snapshot()
+        subjects = data['subjects']
+        order = data['order']
+        if student_class is not None:
+            order = order[self._selected(data, student_class)[order]]
+
+        # Média por matéria arredondada como no relatório e média geral das matérias com nota
+        rounded = self._round_table()[divide(data['sums'][order], data['counts'][order], 4)]
+        total = np.zeros(len(order))
+        for code in range(len(subjects)):
+            # Soma coluna a coluna: mesma ordem (e mesmo resultado em float) do laço original
+            total = total + np.where(rounded[:, code] > 0, rounded[:, code], 0.0)
+        subject_count = (rounded > 0).sum(axis=1)
+
+        class_names = data['class_names']
+        names = data['names']
+        for position, index in enumerate(order.tolist()):
+            student_data = {
+                'id': int(data['ids'][index]),
+                'name': names[index],
+                'class': class_names[data['class_codes'][index]],
+                'subjects': {
+                    subject['id']: {'name': subject['name'], 'average': float(rounded[position, code])}
+                    for code, subject in enumerate(subjects)
+                },
+                'general_average': 0,
+                'status': 'Sem Notas'
+            }
+            if subject_count[position] > 0:
+                general_avg = round(float(total[position]) / int(subject_count[position]), 1)
+                student_data['general_average'] = general_avg
+                if general_avg >= 6:
+                    student_data['status'] = 'Aprovado'
+                elif general_avg >= 4:
+                    student_data['status'] = 'Recuperação'
+                else:
+                    student_data['status'] = 'Reprovado'
+            yield student_data
+
+    def stats(self):
+        """Estado do motor para /api/health e /api/metrics"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'loaded': self._loaded_at is not None,
+                'stale': self._stale,
+                'age': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+                'students': len(self._student_index),
+                'subjects': len(self._subjects),
+                **self._stats
+            }
+
+
+# Instância compartilhada entre rotas e modelos
+analytics = AnalyticsEngine()
@@ -1,39 +1,22 @@
 from flask import Flask, jsonify
-import mysql.connector
+from database import get_database, init_app
 
 app = Flask(__name__)
+init_app(app)
 
 # Rota para buscar todos os alunos
 @app.route('/api/alunos')
 def get_alunos():
-    conn = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='escola_escudo'
-    )
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM alunos")
-    alunos = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(alunos)
+    db = get_database()
+    alunos = db.fetch_query("SELECT * FROM alunos") if db else None
+    return jsonify(alunos or [])
 
 # Rota para buscar todas as turmas
 @app.route('/api/turmas')
 def get_turmas():
-    conn = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='escola_escudo'
-    )
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM turmas")
-    turmas = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(turmas)
+    db = get_database()
+    turmas = db.fetch_query("SELECT * FROM turmas") if db else None
+    return jsonify(turmas or [])
 
 if __name__ == '__main__':
     app.run(debug=True)
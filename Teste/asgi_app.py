@@ -0,0 +1,683 @@
+"""
+Modo de execução assíncrono (ASGI) da API da Escola Escudo
+
+Expõe as mesmas rotas e respostas JSON de av1.app.py usando Quart. As
+leituras simples usam AsyncDatabase (aiomysql), sem prender uma thread
+enquanto aguardam o MySQL. Dashboard, relatórios e escritas reaproveitam os
+modelos síncronos (snapshots, motor analítico, transações, resumo de notas
+e invalidação do cache) em uma thread auxiliar.
+
+Execução:
+    hypercorn asgi_app:app --bind 0.0.0.0:5000
+"""
+
+import asyncio
+import io
+import json
+import time
+import mysql.connector
+from functools import wraps
+from quart import Quart, jsonify, request, make_response, Response, g
+from quart.json.provider import DefaultJSONProvider
+try:
+    from quart_cors import cors
+except ImportError:
+    cors = lambda app: app
+from av1.models import Student, Subject, Grade, Dashboard, Reports, DEFAULT_PAGE_SIZE
+from av1.database import get_database, Database, start_query_stats, current_query_stats, normalize_sql
+from async_database import get_async_database
+from cache import response_cache, invalidate
+from analytics import analytics
+from metrics import route_metrics, server_timing, process_gauges, SERVER_TIMING_SQL
+from snapshots import snapshot_scheduler
+from workers import report_executor
+from rows import json_default
+from startup import startup
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Mesmo JSON de av1.app.py: UTF-8 sem escapes e Decimal como número"""
+
+    ensure_ascii = False
+    default = staticmethod(json_default)
+
+
+app = cors(Quart(__name__))
+
+# Configuração do Quart (indentado só em debug)
+app.json = JSONProvider(app)
+
+# Relatórios pré-calculados em segundo plano (os mesmos de av1.app.py)
+snapshot_scheduler.register('dashboard', Dashboard.get_stats, ('students', 'subjects', 'grades'))
+snapshot_scheduler.register('general', Reports.get_general_stats, ('students', 'grades'))
+snapshot_scheduler.register('classes', Reports.get_class_report, ('students', 'grades'))
+snapshot_scheduler.register('students', Reports.get_student_report, ('students', 'subjects', 'grades'))
+snapshot_scheduler.register('subjects', Reports.get_subject_report, ('subjects', 'grades'))
+
+
+async def run_sync(func, *args, **kwargs):
+    """Executa código síncrono (modelos) em uma thread auxiliar; as consultas
+    dela entram nas estatísticas de SQL da requisição (o contexto é copiado)"""
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+def render_json(value):
+    """Serializa como jsonify (compacto, chaves ordenadas) para os snapshots"""
+    return app.json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+@app.before_request
+async def start_request_timer():
+    g._request_started = time.perf_counter()
+    start_query_stats()
+
+@app.after_request
+async def record_request_metrics(response):
+    """Expõe o tempo de banco da requisição (Server-Timing) e agrega por rota"""
+    started = g.get('_request_started')
+    if started is None:
+        return response
+
+    duration = time.perf_counter() - started
+    stats = current_query_stats(create=False)
+    # SQL do comando mais lento só em debug ou com SERVER_TIMING_SQL=1
+    response.headers['Server-Timing'] = server_timing(duration, stats, normalize_sql,
+                                                      include_sql=SERVER_TIMING_SQL or app.debug)
+
+    route = request.url_rule.rule if request.url_rule else 'não encontrada'
+    route_metrics.observe(request.method, route, response.status_code, duration, stats)
+    return response
+
+def cached_response(*tags):
+    """Serve a resposta do cache enquanto as tabelas informadas não forem alteradas"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            key = request.full_path
+            cached = response_cache.get(key)
+            if cached is not None:
+                response = Response(cached, status=200, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            generation = response_cache.generation(tags)
+            response = await make_response(await view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(key, await response.get_data(), tags, generation)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def conditional_response(*tags):
+    """Emite ETag/Last-Modified pela versão das tabelas e responde 304 sem
+    executar a rota quando o cliente já tem a versão atual"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            etag, last_modified = response_cache.data_version(tags)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(request.if_modified_since and last_modified <= request.if_modified_since)
+
+            if not_modified:
+                response = Response('', status=304)
+            else:
+                response = await make_response(await view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def snapshot_response(name):
+    """Serve o último snapshot pré-calculado da rota, com ETag/Last-Modified da
+    sua geração; sem snapshot (ainda), ou com filtros na query string, executa a rota"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            snapshot = snapshot_scheduler.get(name)
+            if snapshot is None or set(request.args) - {'stream'}:
+                return await view(*args, **kwargs)
+
+            etag = f"{name}-{snapshot.generation}-{int(snapshot.generated_at.timestamp())}"
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(request.if_modified_since and
+                                    snapshot.generated_at.replace(microsecond=0) <= request.if_modified_since)
+
+            if not_modified:
+                response = Response('', status=304)
+            else:
+                response = Response(snapshot.body, status=200, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            response.last_modified = snapshot.generated_at
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Snapshot-Generation'] = str(snapshot.generation)
+            response.headers['X-Snapshot-Generated-At'] = snapshot.generated_at.isoformat()
+            return response
+        return wrapper
+    return decorator
+
+def wants_stream():
+    """Indica se o cliente pediu a resposta em streaming (?stream=1)"""
+    return request.args.get('stream') in ('1', 'true')
+
+def stream_json(rows):
+    """Resposta JSON (array) escrita no socket à medida que as linhas chegam"""
+    async def generate():
+        yield '['
+        index = 0
+        async for row in rows:
+            yield (',' if index else '') + app.json.dumps(row)
+            index += 1
+        yield ']'
+    return Response(generate(), mimetype='application/json')
+
+def page_args():
+    """Lê fields, cursor e limit da query string (None se a rota não for paginada)"""
+    fields = request.args.get('fields')
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+
+    if not (fields or cursor or limit):
+        return None
+    if cursor and not limit:
+        limit = DEFAULT_PAGE_SIZE
+    return {'fields': fields, 'cursor': cursor, 'limit': limit}
+
+@app.before_serving
+async def open_pool():
+    """Prepara schema, pool síncrono e catálogo de matérias (startup.py) e abre
+    o pool assíncrono antes de aceitar requisições"""
+    await run_sync(startup.run)
+    # Sem o pool assíncrono (DB_BACKEND diferente de mysql) o servidor não sobe
+    await get_async_database()
+    # Iniciado no próprio processo que atende (cada worker do hypercorn tem o seu)
+    snapshot_scheduler.start(app, render=render_json)
+
+@app.after_serving
+async def close_pool():
+    """Fecha o pool assíncrono ao encerrar o servidor"""
+    snapshot_scheduler.stop()
+    db = await get_async_database()
+    if db:
+        await db.disconnect()
+
+@app.errorhandler(404)
+async def not_found(error):
+    return jsonify({'message': 'Endpoint não encontrado'}), 404
+
+@app.errorhandler(500)
+async def internal_error(error):
+    return jsonify({'message': 'Erro interno do servidor'}), 500
+
+# ============ ROTAS DOS ESTUDANTES ============
+
+@app.route('/api/students', methods=['GET'])
+@conditional_response('students')
+async def get_students():
+    """Retorna lista de todos os estudantes do MySQL"""
+    try:
+        page = page_args()
+        if page:
+            return jsonify(await run_sync(Student.get_page, **page)), 200
+
+        db = await get_async_database()
+        if wants_stream():
+            return stream_json(db.iter_query("SELECT * FROM students"))
+
+        students = await db.fetch_query("SELECT * FROM students")
+        return jsonify(students or []), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar estudantes: {str(e)}'}), 500
+
+@app.route('/api/students/<int:student_id>', methods=['GET'])
+@conditional_response('students')
+async def get_student(student_id):
+    """Retorna um estudante específico"""
+    try:
+        db = await get_async_database()
+        result = await db.fetch_query("SELECT * FROM students WHERE id = %s", (student_id,))
+        if result:
+            return jsonify(result[0]), 200
+        else:
+            return jsonify({'message': 'Estudante não encontrado'}), 404
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar estudante: {str(e)}'}), 500
+
+@app.route('/api/students', methods=['POST'])
+async def create_student():
+    """Cria um novo estudante no MySQL"""
+    try:
+        data = await request.get_json()
+        error = Student.validate(data)
+        if error:
+            return jsonify({'message': error}), 400
+
+        # Como as demais escritas: modelo síncrono (cache e motor analítico) em uma thread
+        student = Student(
+            name=data['name'],
+            email=data['email'],
+            age=data['age'],
+            student_class=data['class']
+        )
+        if not await run_sync(student.save, strict=True):
+            return jsonify({'message': 'Erro ao criar estudante'}), 500
+
+        return jsonify({
+            'message': 'Estudante criado com sucesso',
+            'id': student.id
+        }), 201
+    except mysql.connector.IntegrityError:
+        return jsonify({'message': 'Email já está em uso'}), 400
+    except Exception as e:
+        if 'Duplicate entry' in str(e):
+            return jsonify({'message': 'Email já está em uso'}), 400
+        return jsonify({'message': f'Erro ao criar estudante: {str(e)}'}), 500
+
+@app.route('/api/students/import', methods=['POST'])
+async def import_students():
+    """Importa estudantes em massa a partir de CSV ou NDJSON (resposta em NDJSON).
+    No modo assíncrono o corpo é lido por inteiro antes da importação; para
+    arquivos muito grandes prefira o modo WSGI, que lê o corpo em streaming."""
+    mimetype = request.mimetype
+    if mimetype not in ('text/csv', 'application/x-ndjson', 'application/jsonl'):
+        return jsonify({'message': 'Use Content-Type text/csv ou application/x-ndjson'}), 415
+
+    chunk_size = max(1, min(request.args.get('chunk_size', 500, type=int), 5000))
+    body = io.BytesIO(await request.get_data())
+
+    def run_import():
+        import csv
+        text = io.TextIOWrapper(body, encoding='utf-8-sig', newline='')
+
+        def rows():
+            if mimetype == 'text/csv':
+                reader = csv.DictReader(text)
+                for row in reader:
+                    age = (row.get('age') or '').strip()
+                    row['age'] = int(age) if age.isdigit() else age
+                    yield reader.line_num, row
+                return
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+
+        lines = []
+        summary = {'status': 'done', 'inserted': 0, 'duplicate': 0, 'invalid': 0, 'error': 0}
+        for result in Student.bulk_insert(rows(), chunk_size):
+            if result['status'] == 'chunk':
+                summary['inserted'] += result['inserted']
+                continue
+            summary[result['status']] += len(result.get('lines', [None]))
+            lines.append(json.dumps(result, ensure_ascii=False) + '\n')
+        lines.append(json.dumps(summary, ensure_ascii=False) + '\n')
+        return ''.join(lines)
+
+    return Response(await run_sync(run_import), mimetype='application/x-ndjson')
+
+@app.route('/api/students/<int:student_id>', methods=['PUT'])
+async def update_student(student_id):
+    """Atualiza um estudante"""
+    try:
+        data = await request.get_json()
+
+        existing_student = await run_sync(Student.get_by_id, student_id)
+        if not existing_student:
+            return jsonify({'message': 'Estudante não encontrado'}), 404
+
+        def save():
+            student = Student(
+                id=student_id,
+                name=data.get('name'),
+                email=data.get('email'),
+                age=data.get('age'),
+                student_class=data.get('class')
+            )
+            return student.save()
+
+        if await run_sync(save):
+            return jsonify({'message': 'Estudante atualizado com sucesso'}), 200
+        else:
+            return jsonify({'message': 'Erro ao atualizar estudante'}), 500
+
+    except Exception as e:
+        if 'Duplicate entry' in str(e):
+            return jsonify({'message': 'Email já está em uso'}), 400
+        return jsonify({'message': f'Erro ao atualizar estudante: {str(e)}'}), 500
+
+@app.route('/api/students/<int:student_id>', methods=['DELETE'])
+async def delete_student(student_id):
+    """Remove um estudante"""
+    try:
+        if await run_sync(lambda: Student(id=student_id).delete()):
+            return jsonify({'message': 'Estudante excluído com sucesso'}), 200
+        else:
+            return jsonify({'message': 'Estudante não encontrado'}), 404
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao excluir estudante: {str(e)}'}), 500
+
+@app.route('/api/students/<int:student_id>/scorecard', methods=['GET'])
+@conditional_response('students', 'subjects', 'grades')
+async def get_student_scorecard(student_id):
+    """Retorna notas por bimestre, média e status do aluno em todas as matérias"""
+    try:
+        scorecard = await run_sync(Grade.get_student_scorecard, student_id)
+        if scorecard is None:
+            return jsonify({'message': 'Estudante não encontrado'}), 404
+        return jsonify({'student_id': student_id, 'subjects': scorecard}), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar boletim: {str(e)}'}), 500
+
+# ============ ROTAS DAS MATÉRIAS ============
+
+@app.route('/api/subjects', methods=['GET'])
+@conditional_response('subjects')
+async def get_subjects():
+    """Retorna lista de todas as matérias"""
+    try:
+        page = page_args()
+        if page:
+            return jsonify(await run_sync(Subject.get_page, **page)), 200
+
+        db = await get_async_database()
+        subjects = await db.fetch_query("SELECT * FROM subjects ORDER BY name")
+        return jsonify(subjects or []), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar matérias: {str(e)}'}), 500
+
+@app.route('/api/subjects/<string:subject_id>', methods=['GET'])
+@conditional_response('subjects')
+async def get_subject(subject_id):
+    """Retorna uma matéria específica"""
+    try:
+        db = await get_async_database()
+        result = await db.fetch_query("SELECT * FROM subjects WHERE id = %s", (subject_id,))
+        if result:
+            return jsonify(result[0]), 200
+        else:
+            return jsonify({'message': 'Matéria não encontrada'}), 404
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar matéria: {str(e)}'}), 500
+
+# ============ ROTAS DAS NOTAS ============
+
+@app.route('/api/grades', methods=['GET'])
+@conditional_response('students', 'subjects', 'grades')
+async def get_grades():
+    """Retorna notas com filtros opcionais"""
+    try:
+        student_id = request.args.get('student_id', type=int)
+        subject_id = request.args.get('subject_id')
+
+        page = page_args()
+        if page:
+            grades = await run_sync(Grade.get_page, student_id=student_id, subject_id=subject_id, **page)
+            return jsonify(grades), 200
+
+        query = """
+        SELECT g.*, s.name as student_name, sub.name as subject_name
+        FROM grades g
+        JOIN students s ON g.student_id = s.id
+        JOIN subjects sub ON g.subject_id = sub.id
+        """
+
+        conditions = []
+        params = []
+
+        if student_id:
+            conditions.append("g.student_id = %s")
+            params.append(student_id)
+
+        if subject_id:
+            conditions.append("g.subject_id = %s")
+            params.append(subject_id)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY s.name, sub.name, g.period"
+
+        db = await get_async_database()
+        if wants_stream():
+            return stream_json(db.iter_query(query, tuple(params)))
+
+        grades = await db.fetch_query(query, tuple(params))
+        return jsonify(grades or []), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar notas: {str(e)}'}), 500
+
+@app.route('/api/grades', methods=['POST'])
+async def create_grade():
+    """Cria ou atualiza uma nota"""
+    try:
+        data = await request.get_json()
+
+        # Validar dados obrigatórios
+        required_fields = ['student_id', 'subject_id', 'period', 'grade']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'message': f'Campo obrigatório não fornecido: {field}'}), 400
+
+        # Validar valores
+        if not (1 <= data['period'] <= 4):
+            return jsonify({'message': 'Período deve estar entre 1 e 4'}), 400
+
+        if not (0 <= data['grade'] <= 10):
+            return jsonify({'message': 'Nota deve estar entre 0 e 10'}), 400
+
+        def save():
+            grade = Grade(
+                student_id=data['student_id'],
+                subject_id=data['subject_id'],
+                period=data['period'],
+                grade=data['grade']
+            )
+            return grade.save()
+
+        if await run_sync(save):
+            return jsonify({'message': 'Nota salva com sucesso'}), 201
+        else:
+            return jsonify({'message': 'Erro ao salvar nota'}), 500
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao salvar nota: {str(e)}'}), 500
+
+@app.route('/api/grades/grid', methods=['POST'])
+async def save_grade_grid():
+    """Salva uma planilha de notas (turma × matéria × bimestre) de uma só vez"""
+    try:
+        data = await request.get_json()
+
+        if not data or not data.get('subject_id'):
+            return jsonify({'message': 'Campo obrigatório não fornecido: subject_id'}), 400
+        if not isinstance(data.get('grades'), list):
+            return jsonify({'message': 'Campo obrigatório não fornecido: grades'}), 400
+
+        results = await run_sync(Grade.save_grid, data['subject_id'], data['grades'], data.get('period'))
+        if results is None:
+            return jsonify({'message': 'Erro na conexão com o banco de dados'}), 500
+
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+
+        return jsonify({
+            'message': 'Planilha processada',
+            'summary': summary,
+            'cells': results
+        }), 200
+
+    except Exception as e:
+        return jsonify({'message': f'Erro ao salvar planilha: {str(e)}'}), 500
+
+@app.route('/api/grades/student/<int:student_id>/subject/<string:subject_id>', methods=['GET'])
+@conditional_response('students', 'subjects', 'grades')
+async def get_student_subject_grades(student_id, subject_id):
+    """Retorna todas as notas de um aluno em uma matéria"""
+    try:
+        scorecard = await run_sync(Grade.get_student_scorecard, student_id, subject_id)
+
+        if not scorecard:
+            return jsonify({'grades': [], 'average': 0.0, 'status': 'Sem Notas'}), 200
+
+        subject = scorecard[0]
+        return jsonify({
+            'grades': subject['grades'],
+            'average': subject['average'],
+            'status': subject['status']
+        }), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar notas: {str(e)}'}), 500
+
+# ============ ROTAS DO DASHBOARD ============
+
+@app.route('/api/dashboard', methods=['GET'])
+@snapshot_response('dashboard')
+@conditional_response('students', 'subjects', 'grades')
+@cached_response('students', 'subjects', 'grades')
+async def get_dashboard():
+    """Retorna estatísticas do dashboard"""
+    try:
+        stats = await run_sync(Dashboard.get_stats)
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar estatísticas: {str(e)}'}), 500
+
+# ============ ROTAS DOS RELATÓRIOS ============
+
+@app.route('/api/reports/general', methods=['GET'])
+@snapshot_response('general')
+@conditional_response('students', 'grades')
+@cached_response('students', 'grades')
+async def get_general_report():
+    """Retorna relatório geral de aprovação (?class= restringe a uma turma)"""
+    try:
+        stats = await run_sync(Reports.get_general_stats, request.args.get('class'))
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
+
+@app.route('/api/reports/classes', methods=['GET'])
+@snapshot_response('classes')
+@conditional_response('students', 'grades')
+@cached_response('students', 'grades')
+async def get_class_report():
+    """Retorna relatório de aprovação por turma (?class= calcula só uma turma)"""
+    try:
+        report = await run_sync(Reports.get_class_report, request.args.get('class'))
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
+
+@app.route('/api/reports/students', methods=['GET'])
+@snapshot_response('students')
+@conditional_response('students', 'subjects', 'grades')
+@cached_response('students', 'subjects', 'grades')
+async def get_student_report():
+    """Retorna relatório detalhado por estudante (?class= restringe a uma turma).
+    Sem streaming aqui: o gerador do modelo usa a conexão da thread auxiliar."""
+    try:
+        report = await run_sync(Reports.get_student_report, request.args.get('class'))
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
+
+@app.route('/api/reports/subjects', methods=['GET'])
+@snapshot_response('subjects')
+@conditional_response('subjects', 'grades')
+@cached_response('subjects', 'grades')
+async def get_subject_report():
+    """Retorna relatório por matéria"""
+    try:
+        report = await run_sync(Reports.get_subject_report)
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
+
+# ============ ROTAS DE UTILITÁRIOS ============
+
+@app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Verifica se a API está funcionando"""
+    try:
+        db = await get_async_database()
+        if db and await db.fetch_query("SELECT 1 as ok"):
+            sync_db = get_database()
+            return jsonify({
+                'status': 'OK',
+                'message': 'API funcionando corretamente',
+                'database': 'Conectado',
+                'mode': 'asgi',
+                'pool': sync_db.pool_stats() if sync_db else {},
+                'async_pool': db.pool_stats(),
+                'statements': sync_db.statement_stats() if sync_db else {},
+                'replicas': sync_db.replica_stats() if sync_db else [],
+                'analytics': analytics.stats(),
+                'snapshots': snapshot_scheduler.stats(),
+                'report_workers': report_executor.stats(),
+                'startup': startup.stats()
+            }), 200
+        else:
+            return jsonify({
+                'status': 'ERROR',
+                'message': 'Erro na conexão com o banco de dados',
+                'database': 'Desconectado'
+            }), 500
+    except Exception as e:
+        return jsonify({
+            'status': 'ERROR',
+            'message': f'Erro no servidor: {str(e)}',
+            'database': 'Erro'
+        }), 500
+
+@app.route('/api/cache', methods=['GET'])
+async def cache_stats():
+    """Retorna os contadores do cache de respostas"""
+    return jsonify(response_cache.stats()), 200
+
+@app.route('/api/metrics', methods=['GET'])
+async def metrics():
+    """Métricas por rota (requisições, duração e SQL) no formato do Prometheus"""
+    gauges = await run_sync(process_gauges, get_database())
+    db = await get_async_database()
+    if db:
+        for key, value in db.pool_stats().items():
+            gauges[f'escola_async_pool_{key}'] = (f'Pool assíncrono: {key}', value)
+
+    return Response(route_metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/init', methods=['POST'])
+async def initialize_system():
+    """Inicializa o sistema criando banco e tabelas"""
+    try:
+        if await run_sync(Database().create_database):
+            invalidate('students', 'subjects', 'grades')
+            analytics.mark_stale()
+            snapshot_scheduler.refresh()
+            return jsonify({'message': 'Sistema inicializado com sucesso'}), 200
+        else:
+            return jsonify({'message': 'Erro ao inicializar sistema'}), 500
+    except Exception as e:
+        return jsonify({'message': f'Erro ao inicializar: {str(e)}'}), 500
+
+if __name__ == '__main__':
+    # Servidor de desenvolvimento do Quart (em produção use hypercorn/uvicorn)
+    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+from database import primary_settings, record_query, record_rows
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+
+class AsyncDatabase:
+    """Versão assíncrona de Database (aiomysql), com pool próprio, para o modo ASGI.
+    Conecta ao mesmo servidor que Database usa para as escritas (o primário:
+    DB_HOST/DB_PORT/... ou DB_PRIMARY); as réplicas de leitura não são usadas aqui,
+    então as leituras sempre enxergam as escritas já confirmadas."""
+
+    def __init__(self, pool_size=None, max_overflow=None, pool_recycle=None, primary=None):
+        self.backend = os.getenv('DB_BACKEND', 'mysql')
+        args = primary_settings(primary)
+        self.host, self.port = args['host'], args['port']
+        self.database, self.user, self.password = args['database'], args['user'], args['password']
+        self.pool_size = pool_size or int(os.getenv('DB_POOL_SIZE', 5))
+        self.max_overflow = max_overflow if max_overflow is not None else int(os.getenv('DB_POOL_MAX_OVERFLOW', 10))
+        self.pool_recycle = pool_recycle or int(os.getenv('DB_POOL_RECYCLE', 3600))
+        self.pool = None
+
+    async def connect(self):
+        """Cria o pool assíncrono de conexões"""
+        if self.backend != 'mysql':
+            # As escritas iriam para o SQLite (Database) e as leituras para um MySQL
+            raise RuntimeError(f"O modo ASGI requer DB_BACKEND=mysql (configurado: {self.backend}); "
+                               "com SQLite use av1.app.py")
+        if aiomysql is None:
+            print("Erro ao conectar com MySQL: o modo assíncrono requer o pacote aiomysql")
+            return False
+
+        try:
+            self.pool = await aiomysql.create_pool(
+                host=self.host,
+                port=self.port,
+                db=self.database,
+                user=self.user,
+                password=self.password,
+                charset='utf8mb4',
+                minsize=self.pool_size,
+                maxsize=self.pool_size + self.max_overflow,
+                pool_recycle=self.pool_recycle,
+                # Leituras sem transação implícita: com autocommit=False cada SELECT
+                # deixava uma transação aberta, o aiomysql fechava a conexão ao
+                # devolvê-la (ou ela leria um snapshot antigo do REPEATABLE READ)
+                autocommit=True
+            )
+            print(f"Pool assíncrono conectado ao MySQL em {self.host}:{self.port} (pool: {self.pool_size}+{self.max_overflow})")
+            return True
+
+        except aiomysql.Error as e:
+            print(f"Erro ao conectar com MySQL: {e}")
+            return False
+
+    async def disconnect(self):
+        """Fecha todas as conexões do pool"""
+        if self.pool:
+            self.pool.close()
+            await self.pool.wait_closed()
+            print("Conexões MySQL (assíncronas) fechadas")
+
+    async def execute_query(self, query, params=None):
+        """Executa uma query de modificação (INSERT, UPDATE, DELETE).
+        O commit explícito continua valendo se o pool for criado sem autocommit."""
+        async with self.pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                try:
+                    await cursor.execute(query, params or None)
+                    await connection.commit()
+                    return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
+
+                except aiomysql.IntegrityError:
+                    await connection.rollback()
+                    raise
+
+                except aiomysql.Error as e:
+                    print(f"Erro ao executar query: {e}")
+                    await connection.rollback()
+                    return None
+
+    async def fetch_query(self, query, params=None):
+        """Executa uma query de consulta (SELECT)"""
+        async with self.pool.acquire() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                try:
+                    started = time.perf_counter()
+                    await cursor.execute(query, params or None)
+                    rows = await cursor.fetchall()
+                    record_query(query, time.perf_counter() - started)
+                    record_rows(len(rows))
+                    return rows
+
+                except aiomysql.Error as e:
+                    print(f"Erro ao executar consulta: {e}")
+                    return None
+
+    async def fetch_many(self, *queries):
+        """Executa consultas independentes em paralelo, cada uma em sua conexão.
+        Cada item é uma query ou uma tupla (query, params)."""
+        return await asyncio.gather(*[
+            self.fetch_query(*query) if isinstance(query, tuple) else self.fetch_query(query)
+            for query in queries
+        ])
+
+    async def iter_query(self, query, params=None, batch_size=500):
+        """Gera as linhas de uma consulta com cursor não bufferizado (SSDictCursor)"""
+        async with self.pool.acquire() as connection:
+            async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+                started = time.perf_counter()
+                await cursor.execute(query, params or None)
+                record_query(query, time.perf_counter() - started)
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    record_rows(len(rows))
+                    for row in rows:
+                        yield row
+
+    def pool_stats(self):
+        """Retorna estatísticas do pool assíncrono"""
+        if not self.pool:
+            return {}
+        return {
+            'size': self.pool.minsize,
+            'max_size': self.pool.maxsize,
+            'open': self.pool.size,
+            'idle': self.pool.freesize,
+            'checked_out': self.pool.size - self.pool.freesize,
+            'recycle': self.pool_recycle
+        }
+
+
+# Singleton instance
+async_db_instance = None
+_async_db_lock = asyncio.Lock()
+
+async def get_async_database():
+    """Retorna a instância singleton do banco de dados assíncrono"""
+    global async_db_instance
+    if async_db_instance is None:
+        async with _async_db_lock:
+            if async_db_instance is None:
+                db = AsyncDatabase()
+                if not await db.connect():
+                    return None
+                async_db_instance = db
+    return async_db_instance
@@ -1,24 +1,160 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, make_response, Response, stream_with_context, g
+from functools import wraps
 try:
     from flask_cors import CORS
 except ImportError:
     CORS = lambda app: None
+import csv
+import io
 import json
-from av1.models import Student, Subject, Grade, Dashboard, Reports
-from av1.database import get_database, Database
+import mysql.connector
+import time
+from av1.models import Student, Subject, Grade, Dashboard, Reports, DEFAULT_PAGE_SIZE
+from av1.database import get_database, Database, init_app, current_query_stats, normalize_sql
+from cache import response_cache, invalidate
+from analytics import analytics
+from metrics import route_metrics, server_timing, process_gauges, SERVER_TIMING_SQL
+from snapshots import snapshot_scheduler
+from workers import report_executor
+from rows import JSONProvider
+from startup import startup
 
 app = Flask(__name__)
 CORS(app)
+init_app(app)
 
-# Configuração do Flask
-app.config['JSON_AS_ASCII'] = False
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+# Configuração do Flask: JSON em UTF-8, Decimal como número, listagens pelo
+# encoder das linhas tipadas; indentado só em debug (compact=None)
+app.json = JSONProvider(app)
 
-@app.before_first_request
-def initialize_database():
-    """Inicializa o banco de dados na primeira requisição"""
-    db = Database()
-    db.create_database()
+# Relatórios recalculados em segundo plano (SNAPSHOT_INTERVAL=0 desativa)
+snapshot_scheduler.register('dashboard', Dashboard.get_stats, ('students', 'subjects', 'grades'))
+snapshot_scheduler.register('general', Reports.get_general_stats, ('students', 'grades'))
+snapshot_scheduler.register('classes', Reports.get_class_report, ('students', 'grades'))
+snapshot_scheduler.register('students', Reports.get_student_report, ('students', 'subjects', 'grades'))
+snapshot_scheduler.register('subjects', Reports.get_subject_report, ('subjects', 'grades'))
+
+# Schema (DDL só se mudou), pool e catálogo de matérias antes de aceitar requisições
+startup.run()
+
+@app.before_request
+def start_request_timer():
+    g._request_started = time.perf_counter()
+
+@app.before_request
+def start_snapshot_scheduler():
+    # Iniciado no próprio processo que atende (após o fork do servidor)
+    snapshot_scheduler.start(app)
+
+@app.after_request
+def record_request_metrics(response):
+    """Expõe o tempo de banco da requisição (Server-Timing) e agrega por rota"""
+    started = g.get('_request_started')
+    if started is None:
+        return response
+    
+    duration = time.perf_counter() - started
+    stats = current_query_stats(create=False)
+    # SQL do comando mais lento só em debug ou com SERVER_TIMING_SQL=1
+    response.headers['Server-Timing'] = server_timing(duration, stats, normalize_sql,
+                                                      include_sql=SERVER_TIMING_SQL or app.debug)
+    
+    route = request.url_rule.rule if request.url_rule else 'não encontrada'
+    route_metrics.observe(request.method, route, response.status_code, duration, stats)
+    return response
+
+def cached_response(*tags):
+    """Serve a resposta do cache enquanto as tabelas informadas não forem alteradas"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.full_path
+            cached = response_cache.get(key)
+            if cached is not None:
+                response = app.response_class(cached, status=200, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            
+            generation = response_cache.generation(tags)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, response.get_data(), tags, generation)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def conditional_response(*tags):
+    """Emite ETag/Last-Modified pela versão das tabelas e responde 304 sem
+    executar a rota quando o cliente já tem a versão atual"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = response_cache.data_version(tags)
+            
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(request.if_modified_since and last_modified <= request.if_modified_since)
+            
+            if not_modified:
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def snapshot_response(name):
+    """Serve o último snapshot pré-calculado da rota, com ETag/Last-Modified da
+    sua geração; sem snapshot (ainda), ou com filtros na query string, executa a rota"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            snapshot = snapshot_scheduler.get(name)
+            if snapshot is None or set(request.args) - {'stream'}:
+                return view(*args, **kwargs)
+            
+            response = app.response_class(snapshot.body, status=200, mimetype='application/json')
+            response.set_etag(f"{name}-{snapshot.generation}-{int(snapshot.generated_at.timestamp())}", weak=True)
+            response.last_modified = snapshot.generated_at
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Snapshot-Generation'] = str(snapshot.generation)
+            response.headers['X-Snapshot-Generated-At'] = snapshot.generated_at.isoformat()
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+def wants_stream():
+    """Indica se o cliente pediu a resposta em streaming (?stream=1)"""
+    return request.args.get('stream') in ('1', 'true')
+
+def stream_json(rows):
+    """Resposta JSON (array) escrita no socket à medida que as linhas chegam"""
+    def generate():
+        yield '['
+        for index, row in enumerate(rows):
+            yield (',' if index else '') + app.json.dumps(row)
+        yield ']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def page_args():
+    """Lê fields, cursor e limit da query string (None se a rota não for paginada)"""
+    fields = request.args.get('fields')
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    
+    if not (fields or cursor or limit):
+        return None
+    if cursor and not limit:
+        limit = DEFAULT_PAGE_SIZE
+    return {'fields': fields, 'cursor': cursor, 'limit': limit}
 
 @app.errorhandler(404)
 def not_found(error):
@@ -32,16 +168,28 @@ def internal_error(error):
 
 
 @app.route('/api/students', methods=['GET'])
+@conditional_response('students')
 def get_students():
     """Retorna lista de todos os estudantes do MySQL"""
     try:
+        page = page_args()
+        if page:
+            return jsonify(Student.get_page(**page)), 200
+        
+        if wants_stream():
+            from av1.models import iter_all_students
+            return stream_json(iter_all_students())
+        
         from av1.models import fetch_all_students
         students = fetch_all_students()
         return jsonify(students), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar estudantes: {str(e)}'}), 500
 
 @app.route('/api/students/<int:student_id>', methods=['GET'])
+@conditional_response('students')
 def get_student(student_id):
     """Retorna um estudante específico"""
     try:
@@ -58,37 +206,76 @@ def create_student():
     """Cria um novo estudante no MySQL"""
     try:
         data = request.get_json()
-        required_fields = ['name', 'email', 'age', 'class']
-        for field in required_fields:
-            if field not in data or not data[field]:
-                return jsonify({'message': f'Campo obrigatório não fornecido: {field}'}), 400
-        if not isinstance(data['age'], int) or data['age'] < 6 or data['age'] > 18:
-            return jsonify({'message': 'Idade deve estar entre 6 e 18 anos'}), 400
-        import mysql.connector
-        conn = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='',
-            database='escola_escudo'
-        )
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO students (name, email, age, student_class) VALUES (%s, %s, %s, %s)",
-            (data['name'], data['email'], data['age'], data['class'])
+        error = Student.validate(data)
+        if error:
+            return jsonify({'message': error}), 400
+        if not get_database():
+            return jsonify({'message': 'Erro na conexão com o banco de dados'}), 500
+        # save() invalida o cache e avisa o motor analítico; strict repropaga o email duplicado
+        student = Student(
+            name=data['name'],
+            email=data['email'],
+            age=data['age'],
+            student_class=data['class']
         )
-        conn.commit()
-        student_id = cursor.lastrowid
-        cursor.close()
-        conn.close()
+        if not student.save(strict=True):
+            return jsonify({'message': 'Erro ao criar estudante'}), 500
         return jsonify({
             'message': 'Estudante criado com sucesso',
-            'id': student_id
+            'id': student.id
         }), 201
     except mysql.connector.IntegrityError:
         return jsonify({'message': 'Email já está em uso'}), 400
     except Exception as e:
         return jsonify({'message': f'Erro ao criar estudante: {str(e)}'}), 500
 
+def _read_import_rows(stream, mimetype):
+    """Lê o corpo da importação linha a linha, gerando (linha, dados)"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    
+    if mimetype == 'text/csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            age = (row.get('age') or '').strip()
+            row['age'] = int(age) if age.isdigit() else age
+            yield reader.line_num, row
+        return
+    
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+@app.route('/api/students/import', methods=['POST'])
+def import_students():
+    """Importa estudantes em massa a partir de CSV ou NDJSON (resposta em NDJSON)"""
+    mimetype = request.mimetype
+    if mimetype not in ('text/csv', 'application/x-ndjson', 'application/jsonl'):
+        return jsonify({'message': 'Use Content-Type text/csv ou application/x-ndjson'}), 415
+    
+    chunk_size = max(1, min(request.args.get('chunk_size', 500, type=int), 5000))
+    stream = request.stream
+    
+    def generate():
+        summary = {'status': 'done', 'inserted': 0, 'duplicate': 0, 'invalid': 0, 'error': 0}
+        try:
+            rows = _read_import_rows(stream, mimetype)
+            for result in Student.bulk_insert(rows, chunk_size):
+                if result['status'] == 'chunk':
+                    summary['inserted'] += result['inserted']
+                    continue
+                summary[result['status']] += len(result.get('lines', [None]))
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+        except Exception as e:
+            summary['status'] = 'aborted'
+            summary['message'] = f'Erro ao importar estudantes: {str(e)}'
+        yield json.dumps(summary, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/api/students/<int:student_id>', methods=['PUT'])
 def update_student(student_id):
     """Atualiza um estudante"""
@@ -136,15 +323,23 @@ def delete_student(student_id):
 # ============ ROTAS DAS MATÉRIAS ============
 
 @app.route('/api/subjects', methods=['GET'])
+@conditional_response('subjects')
 def get_subjects():
     """Retorna lista de todas as matérias"""
     try:
+        page = page_args()
+        if page:
+            return jsonify(Subject.get_page(**page)), 200
+        
         subjects = Subject.get_all()
         return jsonify(subjects), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar matérias: {str(e)}'}), 500
 
 @app.route('/api/subjects/<string:subject_id>', methods=['GET'])
+@conditional_response('subjects')
 def get_subject(subject_id):
     """Retorna uma matéria específica"""
     try:
@@ -159,18 +354,26 @@ def get_subject(subject_id):
 # ============ ROTAS DAS NOTAS ============
 
 @app.route('/api/grades', methods=['GET'])
+@conditional_response('students', 'subjects', 'grades')
 def get_grades():
     """Retorna notas com filtros opcionais"""
     try:
         student_id = request.args.get('student_id', type=int)
         subject_id = request.args.get('subject_id')
         
-        if student_id or subject_id:
+        page = page_args()
+        if page:
+            grades = Grade.get_page(student_id=student_id, subject_id=subject_id, **page)
+        elif wants_stream():
+            return stream_json(Grade.iter_by_filters(student_id, subject_id))
+        elif student_id or subject_id:
             grades = Grade.get_by_filters(student_id, subject_id)
         else:
             grades = Grade.get_all()
             
         return jsonify(grades), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar notas: {str(e)}'}), 500
 
@@ -209,25 +412,71 @@ def create_grade():
     except Exception as e:
         return jsonify({'message': f'Erro ao salvar nota: {str(e)}'}), 500
 
+@app.route('/api/grades/grid', methods=['POST'])
+def save_grade_grid():
+    """Salva uma planilha de notas (turma × matéria × bimestre) de uma só vez"""
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('subject_id'):
+            return jsonify({'message': 'Campo obrigatório não fornecido: subject_id'}), 400
+        if not isinstance(data.get('grades'), list):
+            return jsonify({'message': 'Campo obrigatório não fornecido: grades'}), 400
+        
+        results = Grade.save_grid(data['subject_id'], data['grades'], data.get('period'))
+        if results is None:
+            return jsonify({'message': 'Erro na conexão com o banco de dados'}), 500
+        
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        
+        return jsonify({
+            'message': 'Planilha processada',
+            'summary': summary,
+            'cells': results
+        }), 200
+            
+    except Exception as e:
+        return jsonify({'message': f'Erro ao salvar planilha: {str(e)}'}), 500
+
 @app.route('/api/grades/student/<int:student_id>/subject/<string:subject_id>', methods=['GET'])
+@conditional_response('students', 'subjects', 'grades')
 def get_student_subject_grades(student_id, subject_id):
     """Retorna todas as notas de um aluno em uma matéria"""
     try:
-        grades = Grade.get_student_subject_grades(student_id, subject_id)
-        average = Grade.calculate_subject_average(student_id, subject_id)
-        status = Grade.get_student_status(student_id, subject_id)
+        scorecard = Grade.get_student_scorecard(student_id, subject_id)
+        
+        if not scorecard:
+            return jsonify({'grades': [], 'average': 0.0, 'status': 'Sem Notas'}), 200
         
+        subject = scorecard[0]
         return jsonify({
-            'grades': grades,
-            'average': average,
-            'status': status
+            'grades': subject['grades'],
+            'average': subject['average'],
+            'status': subject['status']
         }), 200
     except Exception as e:
         return jsonify({'message': f'Erro ao buscar notas: {str(e)}'}), 500
 
+@app.route('/api/students/<int:student_id>/scorecard', methods=['GET'])
+@conditional_response('students', 'subjects', 'grades')
+def get_student_scorecard(student_id):
+    """Retorna notas por bimestre, média e status do aluno em todas as matérias"""
+    try:
+        scorecard = Grade.get_student_scorecard(student_id)
+        if scorecard is None:
+            return jsonify({'message': 'Estudante não encontrado'}), 404
+        return jsonify({'student_id': student_id, 'subjects': scorecard}), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao buscar boletim: {str(e)}'}), 500
+
 # ============ ROTAS DO DASHBOARD ============
 
 @app.route('/api/dashboard', methods=['GET'])
+@snapshot_response('dashboard')
+@conditional_response('students', 'subjects', 'grades')
+@cached_response('students', 'subjects', 'grades')
 def get_dashboard():
     """Retorna estatísticas do dashboard"""
     try:
@@ -239,24 +488,49 @@ def get_dashboard():
 # ============ ROTAS DOS RELATÓRIOS ============
 
 @app.route('/api/reports/general', methods=['GET'])
+@snapshot_response('general')
+@conditional_response('students', 'grades')
+@cached_response('students', 'grades')
 def get_general_report():
-    """Retorna relatório geral de aprovação"""
+    """Retorna relatório geral de aprovação (?class= restringe a uma turma)"""
     try:
-        stats = Reports.get_general_stats()
+        stats = Reports.get_general_stats(request.args.get('class'))
         return jsonify(stats), 200
     except Exception as e:
         return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
 
+@app.route('/api/reports/classes', methods=['GET'])
+@snapshot_response('classes')
+@conditional_response('students', 'grades')
+@cached_response('students', 'grades')
+def get_class_report():
+    """Retorna relatório de aprovação por turma (?class= calcula só uma turma)"""
+    try:
+        report = Reports.get_class_report(request.args.get('class'))
+        return jsonify(report), 200
+    except Exception as e:
+        return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
+
 @app.route('/api/reports/students', methods=['GET'])
+@snapshot_response('students')
+@conditional_response('students', 'subjects', 'grades')
+@cached_response('students', 'subjects', 'grades')
 def get_student_report():
-    """Retorna relatório detalhado por estudante"""
+    """Retorna relatório detalhado por estudante (?class= restringe a uma turma)"""
     try:
-        report = Reports.get_student_report()
+        student_class = request.args.get('class')
+        if wants_stream():
+            return stream_json(Reports.iter_student_report(student_class))
+        
+        report = Reports.get_student_report(student_class)
         return jsonify(report), 200
     except Exception as e:
         return jsonify({'message': f'Erro ao gerar relatório: {str(e)}'}), 500
 
 @app.route('/api/reports/subjects', methods=['GET'])
+@snapshot_response('subjects')
+@conditional_response('subjects', 'grades')
+@cached_response('subjects', 'grades')
 def get_subject_report():
     """Retorna relatório por matéria"""
     try:
@@ -272,11 +546,18 @@ def health_check():
     """Verifica se a API está funcionando"""
     try:
         db = get_database()
-        if db and db.connection.is_connected():
+        if db and db.ping():
             return jsonify({
                 'status': 'OK',
                 'message': 'API funcionando corretamente',
-                'database': 'Conectado'
+                'database': 'Conectado',
+                'pool': db.pool_stats(),
+                'statements': db.statement_stats(),
+                'replicas': db.replica_stats(),
+                'analytics': analytics.stats(),
+                'snapshots': snapshot_scheduler.stats(),
+                'report_workers': report_executor.stats(),
+                'startup': startup.stats()
             }), 200
         else:
             return jsonify({
@@ -291,12 +572,27 @@ def health_check():
             'database': 'Erro'
         }), 500
 
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """Retorna os contadores do cache de respostas"""
+    return jsonify(response_cache.stats()), 200
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas por rota (requisições, duração e SQL) no formato do Prometheus"""
+    gauges = process_gauges(get_database())
+    
+    return Response(route_metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/init', methods=['POST'])
 def initialize_system():
     """Inicializa o sistema criando banco e tabelas"""
     try:
         db = Database()
         if db.create_database():
+            invalidate('students', 'subjects', 'grades')
+            analytics.mark_stale()
+            snapshot_scheduler.refresh()
             return jsonify({'message': 'Sistema inicializado com sucesso'}), 200
         else:
             return jsonify({'message': 'Erro ao inicializar sistema'}), 500
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTTP da API da Escola Escudo
+Popula o MySQL local em vários tamanhos (av1.generate.py), sobe av1.app.py
+e exercita todas as rotas com concorrência configurável, registrando
+latência p50/p95/p99, vazão e taxa de erros em um arquivo JSON.
+
+Exemplos:
+    python av1.benchmark.py run --sizes 1000,10000 --concurrency 16 --requests 200 -o base.json
+    python av1.benchmark.py run --url http://localhost:5000 --sizes 0 -o atual.json
+    python av1.benchmark.py compare base.json atual.json --threshold 10
+    python av1.benchmark.py encode --repeat 5
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Servidor sem debug/reloader para medir a aplicação e não o modo de desenvolvimento
+SERVER_BOOTSTRAP = (
+    "import runpy, sys; sys.path.insert(0, {here!r}); "
+    "ns = runpy.run_path({app!r}, run_name='benchmark'); "
+    "ns['app'].run(host='127.0.0.1', port={port}, threaded=True, debug=False)"
+)
+
+
+def percentile(values, pct):
+    """Percentil por posição (nearest-rank) de uma lista ordenada"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+class Client:
+    """Cliente HTTP mínimo (urllib) que mede a latência de cada chamada"""
+
+    def __init__(self, base_url, bust_cache=False):
+        self.base_url = base_url.rstrip('/')
+        self.bust_cache = bust_cache
+        self.counter = itertools.count()
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def request(self, name, method, path, body=None):
+        if self.bust_cache and method == 'GET':
+            path += ('&' if '?' in path else '?') + f'_={next(self.counter)}'
+
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            payload = b''
+            status = 0
+        elapsed = (time.perf_counter() - started) * 1000
+
+        with self.lock:
+            self.samples.setdefault(name, []).append((elapsed, 200 <= status < 400))
+
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+
+def student_crud(client, worker_id, iteration):
+    """Cria, lê, atualiza e remove um estudante"""
+    email = f'bench.{os.getpid()}.{worker_id}.{iteration}.{random.random():.8f}@escudo.example'
+    student = {'name': 'Aluno Benchmark', 'email': email, 'age': 12, 'class': '6º Ano A'}
+    status, body = client.request('POST /api/students', 'POST', '/api/students', student)
+    if status != 201 or not body:
+        return
+    student_id = body['id']
+    client.request('GET /api/students/{id}', 'GET', f'/api/students/{student_id}')
+    client.request('PUT /api/students/{id}', 'PUT', f'/api/students/{student_id}', dict(student, age=13))
+    client.request('DELETE /api/students/{id}', 'DELETE', f'/api/students/{student_id}')
+
+
+def build_operations(client, student_ids, subject_ids):
+    """Lista de operações (nome, função) exercitadas em cada iteração"""
+    def pick_student():
+        return random.choice(student_ids) if student_ids else 1
+
+    def pick_subject():
+        return random.choice(subject_ids) if subject_ids else 'MAT'
+
+    return [
+        ('students', lambda w, i: client.request('GET /api/students', 'GET', '/api/students?limit=50')),
+        ('students_crud', lambda w, i: student_crud(client, w, i)),
+        ('subjects', lambda w, i: client.request('GET /api/subjects', 'GET', '/api/subjects')),
+        ('grades_by_student', lambda w, i: client.request(
+            'GET /api/grades?student_id', 'GET', f'/api/grades?student_id={pick_student()}')),
+        ('grades_by_subject', lambda w, i: client.request(
+            'GET /api/grades?subject_id', 'GET', f'/api/grades?subject_id={pick_subject()}&limit=100')),
+        ('grades_student_subject', lambda w, i: client.request(
+            'GET /api/grades/student/{id}/subject/{sid}', 'GET',
+            f'/api/grades/student/{pick_student()}/subject/{pick_subject()}')),
+        ('grade_save', lambda w, i: client.request('POST /api/grades', 'POST', '/api/grades', {
+            'student_id': pick_student(), 'subject_id': pick_subject(),
+            'period': random.randint(1, 4), 'grade': round(random.uniform(0, 10), 1)})),
+        ('dashboard', lambda w, i: client.request('GET /api/dashboard', 'GET', '/api/dashboard')),
+        ('report_general', lambda w, i: client.request('GET /api/reports/general', 'GET', '/api/reports/general')),
+        ('report_students', lambda w, i: client.request('GET /api/reports/students', 'GET', '/api/reports/students')),
+        ('report_subjects', lambda w, i: client.request('GET /api/reports/subjects', 'GET', '/api/reports/subjects')),
+    ]
+
+
+def run_load(client, operations, concurrency, iterations):
+    """Executa as operações com N workers; cada worker faz `iterations` rodadas"""
+    def worker(worker_id):
+        for iteration in range(iterations):
+            for _, operation in operations:
+                operation(worker_id, iteration)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    return time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """Calcula percentis, vazão e erros por rota"""
+    endpoints = {}
+    for name, values in sorted(samples.items()):
+        latencies = sorted(latency for latency, _ in values)
+        errors = sum(1 for _, ok in values if not ok)
+        endpoints[name] = {
+            'requests': len(values),
+            'errors': errors,
+            'error_rate': round(errors / len(values) * 100, 2) if values else 0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2) if latencies else 0,
+            'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0
+        }
+    return endpoints
+
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/api/health', timeout=2):
+                return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    return False
+
+
+def seed_dataset(size, seed):
+    """Popula o banco com `size` alunos usando o gerador determinístico"""
+    print(f"→ Populando banco com {size} alunos...")
+    subprocess.run(
+        [sys.executable, os.path.join(HERE, 'av1.generate.py'), '--students', str(size),
+         '--seed', str(seed), '--reset'],
+        cwd=HERE, check=True
+    )
+
+
+def start_server(port):
+    code = SERVER_BOOTSTRAP.format(here=HERE, app=os.path.join(HERE, 'av1.app.py'), port=port)
+    return subprocess.Popen([sys.executable, '-c', code], cwd=HERE,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def command_run(args):
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'python': platform.python_version(),
+        'concurrency': args.concurrency,
+        'iterations': args.requests,
+        'bust_cache': args.bust_cache,
+        'runs': []
+    }
+
+    for size in sizes:
+        if size > 0:
+            seed_dataset(size, args.seed)
+
+        server = None
+        base_url = args.url
+        if not base_url:
+            base_url = f'http://127.0.0.1:{args.port}'
+            server = start_server(args.port)
+            if not wait_for_server(base_url):
+                server.terminate()
+                print("✗ Servidor não respondeu a /api/health")
+                return 1
+
+        try:
+            client = Client(base_url, args.bust_cache)
+            _, students = client.request('warmup', 'GET', '/api/students?fields=id&limit=500')
+            _, subjects = client.request('warmup', 'GET', '/api/subjects?fields=id')
+            student_ids = [row['id'] for row in (students or {}).get('items', [])]
+            subject_ids = [row['id'] for row in (subjects or [])]
+            client.samples.clear()
+
+            operations = build_operations(client, student_ids, subject_ids)
+            if args.only:
+                selected = set(args.only.split(','))
+                operations = [op for op in operations if op[0] in selected]
+
+            random.seed(args.seed)
+            print(f"→ {len(operations)} operações × {args.requests} rodadas × {args.concurrency} workers")
+            elapsed = run_load(client, operations, args.concurrency, args.requests)
+
+            run = {'dataset_students': size, 'elapsed_s': round(elapsed, 2),
+                   'endpoints': summarize(client.samples, elapsed)}
+            results['runs'].append(run)
+            print_run(run)
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"✓ Resultados gravados em {args.output}")
+    return 0
+
+
+def print_run(run):
+    print(f"\nDataset: {run['dataset_students']} alunos ({run['elapsed_s']}s)")
+    print(f"{'rota':48} {'req':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'erros':>6}")
+    for name, stats in run['endpoints'].items():
+        print(f"{name:48} {stats['requests']:>6} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+              f"{stats['p99_ms']:>8} {stats['throughput_rps']:>8} {stats['error_rate']:>5}%")
+
+
+def command_compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    base_runs = {run['dataset_students']: run for run in baseline['runs']}
+    regressions = 0
+
+    for run in candidate['runs']:
+        base = base_runs.get(run['dataset_students'])
+        if not base:
+            print(f"(dataset {run['dataset_students']} ausente na base; ignorado)")
+            continue
+
+        print(f"\nDataset: {run['dataset_students']} alunos")
+        print(f"{'rota':48} {'p95 base':>10} {'p95 novo':>10} {'Δ%':>8} {'erros':>8}")
+        for name, stats in run['endpoints'].items():
+            old = base['endpoints'].get(name)
+            if not old:
+                continue
+            delta = ((stats[args.metric] - old[args.metric]) / old[args.metric] * 100) if old[args.metric] else 0
+            regressed = delta > args.threshold or stats['error_rate'] > old['error_rate']
+            regressions += regressed
+            flag = '  ⚠️' if regressed else ''
+            print(f"{name:48} {old[args.metric]:>10} {stats[args.metric]:>10} {delta:>7.1f}% "
+                  f"{stats['error_rate']:>7}%{flag}")
+
+    print(f"\n{regressions} regressão(ões) acima de {args.threshold}% em {args.metric}")
+    return 1 if regressions else 0
+
+
+def command_encode(args):
+    """Serializa as listagens do banco local como antes (dicts do cursor pelo
+    provider padrão do Flask) e com as linhas tipadas + encoder de rows.py"""
+    sys.path.insert(0, HERE)
+    from flask.json.provider import DefaultJSONProvider
+    from rows import encode_rows
+    from av1.models import fetch_all_students, Subject, Grade
+
+    encoders = {
+        'dict_pretty': lambda rows, dicts: json.dumps(dicts, default=DefaultJSONProvider.default, sort_keys=True, indent=2),
+        'dict': lambda rows, dicts: json.dumps(dicts, default=DefaultJSONProvider.default, sort_keys=True, separators=(',', ':')),
+        'rows': lambda rows, dicts: encode_rows(rows)
+    }
+    listings = {'students': fetch_all_students, 'subjects': Subject.get_all, 'grades': Grade.get_all}
+    results = {'label': args.label, 'python': platform.python_version(), 'listings': {}}
+
+    print(f"{'listagem':10} {'formato':12} {'linhas':>8} {'bytes/linha':>12} {'µs/linha':>10} {'memória/linha':>14}")
+    for name, fetch in listings.items():
+        rows = fetch()
+        if not rows:
+            continue
+        dicts = [row.to_dict() for row in rows]
+        memory = {
+            'dict': sum(sys.getsizeof(row) for row in dicts) / len(rows),
+            'rows': sum(sys.getsizeof(row) for row in rows) / len(rows)
+        }
+        results['listings'][name] = {}
+        for kind, encode in encoders.items():
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                body = encode(rows, dicts).encode('utf-8')
+                timings.append(time.perf_counter() - started)
+            stats = {
+                'rows': len(rows),
+                'bytes_per_row': round(len(body) / len(rows), 1),
+                'us_per_row': round(min(timings) / len(rows) * 1e6, 2),
+                'memory_per_row': round(memory['rows' if kind == 'rows' else 'dict'], 1)
+            }
+            results['listings'][name][kind] = stats
+            print(f"{name:10} {kind:12} {stats['rows']:>8} {stats['bytes_per_row']:>12} "
+                  f"{stats['us_per_row']:>10} {stats['memory_per_row']:>14}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✓ Resultados gravados em {args.output}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTTP da API da Escola Escudo')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='executa o benchmark')
+    run.add_argument('--sizes', default='1000', help='tamanhos do dataset (alunos), separados por vírgula; 0 = não popular')
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--concurrency', type=int, default=8, help='requisições simultâneas')
+    run.add_argument('--requests', type=int, default=50, help='rodadas por worker')
+    run.add_argument('--only', help='operações a executar (ex.: dashboard,report_students)')
+    run.add_argument('--bust-cache', action='store_true', help='evita o cache de respostas (mede as consultas)')
+    run.add_argument('--url', help='usa um servidor já em execução em vez de iniciar av1.app.py')
+    run.add_argument('--port', type=int, default=5055)
+    run.add_argument('--label', default='')
+    run.add_argument('-o', '--output', default='bench_results.json')
+    run.set_defaults(func=command_run)
+
+    compare = sub.add_parser('compare', help='compara dois arquivos de resultado')
+    compare.add_argument('baseline')
+    compare.add_argument('candidate')
+    compare.add_argument('--metric', default='p95_ms', choices=['p50_ms', 'p95_ms', 'p99_ms'])
+    compare.add_argument('--threshold', type=float, default=10.0, help='regressão em %% que falha a comparação')
+    compare.set_defaults(func=command_compare)
+
+    encode = sub.add_parser('encode', help='mede bytes e tempo de serialização das listagens (banco local)')
+    encode.add_argument('--repeat', type=int, default=3, help='repetições (vale a melhor)')
+    encode.add_argument('--label', default='')
+    encode.add_argument('-o', '--output')
+    encode.set_defaults(func=command_encode)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
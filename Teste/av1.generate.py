@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Gerador determinístico de dados sintéticos para testes de carga
+Cria uma escola do tamanho pedido (alunos, turmas, matérias, bimestres e
+anos/séries) com a mesma semente produzindo sempre os mesmos dados.
+
+Exemplos:
+    python av1.generate.py --students 100000 --seed 42
+    python av1.generate.py --students 5000 --years 4 --classes 5 --method load-data
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from mysql.connector import Error
+from av1.database import Database
+
+FIRST_NAMES = [
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor',
+    'Isabela', 'João', 'Karina', 'Lucas', 'Mariana', 'Nicolas', 'Olívia', 'Pedro',
+    'Rafaela', 'Samuel', 'Tatiana', 'Vinícius', 'Yasmin', 'Leonardo', 'Beatriz', 'Gustavo'
+]
+
+LAST_NAMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Ferreira',
+    'Rodrigues', 'Almeida', 'Nascimento', 'Carvalho', 'Gomes', 'Martins', 'Barbosa',
+    'Ribeiro', 'Alves', 'Mendes', 'Rocha', 'Dias'
+]
+
+# Catálogo padrão (mesmo de Database.insert_default_data); matérias extras são geradas
+DEFAULT_SUBJECTS = [
+    ('MAT', 'Matemática', 'Prof. Ana Silva', 5),
+    ('POR', 'Português', 'Prof. Carlos Santos', 5),
+    ('HIS', 'História', 'Prof. Maria Oliveira', 3),
+    ('GEO', 'Geografia', 'Prof. João Costa', 3),
+    ('CIE', 'Ciências', 'Prof. Rosa Lima', 4),
+    ('ING', 'Inglês', 'Prof. Peter Johnson', 2)
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos da Escola Escudo')
+    parser.add_argument('--students', type=int, default=1000, help='quantidade de alunos')
+    parser.add_argument('--years', type=int, default=4, help='anos/séries (6º ao 9º Ano = 4)')
+    parser.add_argument('--classes', type=int, default=3, help='turmas por ano (A, B, C...)')
+    parser.add_argument('--subjects', type=int, default=6, help='quantidade de matérias')
+    parser.add_argument('--periods', type=int, default=4, choices=range(1, 5), help='bimestres lançados (1-4)')
+    parser.add_argument('--seed', type=int, default=42, help='semente para reprodutibilidade')
+    parser.add_argument('--batch-size', type=int, default=5000, help='linhas por executemany')
+    parser.add_argument('--commit-every', type=int, default=100000, help='linhas por transação')
+    parser.add_argument('--method', choices=['executemany', 'load-data'], default='executemany',
+                        help='executemany ou LOAD DATA LOCAL INFILE')
+    parser.add_argument('--reset', action='store_true', help='apaga alunos e notas antes de gerar')
+    return parser.parse_args()
+
+
+def build_subjects(count):
+    """Retorna o catálogo de matérias com o tamanho pedido"""
+    subjects = list(DEFAULT_SUBJECTS[:count])
+    for index in range(len(subjects), count):
+        subjects.append((f'M{index + 1:02d}', f'Matéria {index + 1}', f'Prof. {LAST_NAMES[index % len(LAST_NAMES)]}', 2))
+    return subjects
+
+
+def build_classes(years, classes_per_year):
+    """Retorna as turmas ('6º Ano A', ...) com a idade base de cada série"""
+    classes = []
+    for year in range(years):
+        for letter in range(classes_per_year):
+            classes.append((f'{6 + year}º Ano {chr(ord("A") + letter)}', 11 + year))
+    return classes
+
+
+def generate_students(rng, first_id, count, classes):
+    """Gera (id, nome, email, idade, turma) e a 'habilidade' de cada aluno"""
+    for offset in range(count):
+        student_id = first_id + offset
+        student_class, base_age = classes[offset % len(classes)]
+        name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}'
+        age = min(18, max(6, base_age + rng.choice((0, 0, 0, 1))))
+        ability = rng.gauss(6.8, 1.4)
+        yield (student_id, name, f'aluno{student_id}@escudo.example', age, student_class), ability
+
+
+def generate_grades(rng, student_id, ability, subjects, periods):
+    """Gera as notas de um aluno em cada matéria e bimestre"""
+    for subject_id, difficulty in subjects:
+        for period in range(1, periods + 1):
+            grade = rng.gauss(ability - difficulty, 1.2)
+            yield (student_id, subject_id, period, round(min(10.0, max(0.0, grade)), 1))
+
+
+class BulkWriter:
+    """Grava linhas em lotes (executemany) com commit a cada N linhas;
+    cada commit avança a versão da tabela (data_versions) uma vez"""
+
+    def __init__(self, db, connection, table, query, batch_size, commit_every):
+        self.db = db
+        self.connection = connection
+        self.table = table
+        self.cursor = connection.cursor()
+        self.query = query
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.batch = []
+        self.pending = 0
+        self.total = 0
+
+    def add(self, row):
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.cursor.executemany(self.query, self.batch)
+            self.pending += len(self.batch)
+            self.total += len(self.batch)
+            self.batch = []
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        if self.pending:
+            self.db.bump_versions(self.connection, [self.table])
+        self.connection.commit()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.commit()
+        self.cursor.close()
+
+
+class CsvWriter:
+    """Grava as linhas em um CSV temporário para LOAD DATA LOCAL INFILE"""
+
+    def __init__(self, db, connection, table, columns):
+        self.db = db
+        self.connection = connection
+        self.table = table
+        self.columns = columns
+        self.file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.total = 0
+
+    def add(self, row):
+        self.writer.writerow(row)
+        self.total += 1
+
+    def close(self):
+        self.file.close()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\r\\n' "
+                f"({', '.join(self.columns)})",
+                (self.file.name,)
+            )
+            self.db.bump_versions(self.connection, [self.table])
+            self.connection.commit()
+        finally:
+            cursor.close()
+            os.unlink(self.file.name)
+
+
+def open_connection(db, method):
+    """Abre uma conexão dedicada à carga (fora do pool da API)"""
+    return db.open_connection(autocommit=False, allow_local_infile=(method == 'load-data'))
+
+
+def make_writer(db, connection, args, table, columns):
+    if args.method == 'load-data':
+        return CsvWriter(db, connection, table, columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    return BulkWriter(db, connection, table, query, args.batch_size, args.commit_every)
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    print("Inicializando banco de dados...")
+    db = Database()
+    if args.method == 'load-data' and db.backend.name != 'mysql':
+        print("--method load-data só está disponível no MySQL; use executemany")
+        return False
+    if not db.create_database():
+        print("Erro ao criar banco de dados!")
+        return False
+
+    connection = open_connection(db, args.method)
+    cursor = connection.cursor()
+
+    try:
+        if args.reset:
+            print("Removendo alunos e notas existentes...")
+            cursor.execute("DELETE FROM student_subject_stats")
+            cursor.execute("DELETE FROM grades")
+            cursor.execute("DELETE FROM students")
+            db.bump_versions(connection, ['students', 'grades'])
+            connection.commit()
+
+        # Matérias: o catálogo padrão já existe; só as extras são inseridas
+        subjects = build_subjects(args.subjects)
+        cursor.executemany(
+            "INSERT IGNORE INTO subjects (id, name, teacher, hours_per_week) VALUES (%s, %s, %s, %s)",
+            subjects
+        )
+        db.bump_versions(connection, ['subjects'])
+        connection.commit()
+
+        # Dificuldade por matéria também é determinística
+        subject_difficulty = [(subject[0], rng.uniform(-0.6, 0.8)) for subject in subjects]
+        classes = build_classes(args.years, args.classes)
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM students")
+        first_id = cursor.fetchone()[0] + 1
+
+        print(f"Gerando {args.students} alunos em {len(classes)} turmas "
+              f"({args.subjects} matérias × {args.periods} bimestres, semente {args.seed})...")
+
+        students = make_writer(db, connection, args, 'students', ['id', 'name', 'email', 'age', 'class'])
+        abilities = []
+        for row, ability in generate_students(rng, first_id, args.students, classes):
+            students.add(row)
+            abilities.append(ability)
+        students.close()
+        print(f"✓ Alunos: {students.total} ({time.perf_counter() - started:.1f}s)")
+
+        grades = make_writer(db, connection, args, 'grades', ['student_id', 'subject_id', 'period', 'grade'])
+        for offset, ability in enumerate(abilities):
+            for row in generate_grades(rng, first_id + offset, ability, subject_difficulty, args.periods):
+                grades.add(row)
+        grades.close()
+        print(f"✓ Notas: {grades.total} ({time.perf_counter() - started:.1f}s)")
+
+    except Error as e:
+        connection.rollback()
+        print(f"Erro ao gerar dados: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+    print("Reconstruindo resumo de notas (student_subject_stats)...")
+    if not db.connect() or db.rebuild_grade_summary() is None:
+        print("Erro ao reconstruir o resumo de notas!")
+        return False
+
+    elapsed = time.perf_counter() - started
+    total_rows = students.total + grades.total
+    print("=" * 50)
+    print(f"Concluído em {elapsed:.1f}s ({total_rows / elapsed:,.0f} linhas/s)")
+    print("=" * 50)
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -126,6 +126,7 @@ def reset_database():
     
     try:
         # Remover dados na ordem correta (respeitando foreign keys)
+        db.execute_query("DELETE FROM student_subject_stats")
         db.execute_query("DELETE FROM grades")
         db.execute_query("DELETE FROM students")
         print("✓ Todos os dados foram removidos.")
@@ -157,15 +158,21 @@ def show_stats():
     result = db.fetch_query("SELECT COUNT(*) as count FROM subjects")
     subjects_count = result[0]['count'] if result else 0
     
-    # Estatísticas de aprovação
+    # Estatísticas de aprovação (a partir do resumo aluno × matéria)
     result = db.fetch_query("""
         SELECT 
-            COUNT(DISTINCT s.id) as total_students,
-            COUNT(DISTINCT CASE WHEN AVG(g.grade) >= 6 THEN s.id END) as approved,
-            AVG(g.grade) as general_average
-        FROM students s
-        LEFT JOIN grades g ON s.id = g.student_id
-        GROUP BY ()
+            COUNT(*) as total_students,
+            SUM(CASE WHEN avg_grade >= 6 THEN 1 ELSE 0 END) as approved,
+            SUM(grade_sum) / SUM(grade_count) as general_average
+        FROM (
+            SELECT s.id,
+                   SUM(st.grade_sum) / SUM(st.grade_count) as avg_grade,
+                   SUM(st.grade_sum) as grade_sum,
+                   SUM(st.grade_count) as grade_count
+            FROM students s
+            LEFT JOIN student_subject_stats st ON s.id = st.student_id
+            GROUP BY s.id
+        ) per_student
     """)
     
     stats = result[0] if result else {}
@@ -189,6 +196,30 @@ def show_stats():
     
     print("="*40)
 
+def check_grade_summary():
+    """Verifica o resumo de notas (student_subject_stats) e reconstrói se houver divergência"""
+    db = get_database()
+    if not db:
+        print("Erro ao conectar ao banco!")
+        return
+    
+    drift = db.verify_grade_summary()
+    
+    if not drift:
+        print("✓ Resumo de notas consistente com a tabela grades.")
+        return
+    
+    print(f"⚠️  {len(drift)} registro(s) divergente(s) no resumo de notas:")
+    for item in drift[:20]:
+        print(f"   aluno {item['student_id']} / {item['subject_id']}: "
+              f"esperado {item['expected']}, armazenado {item['stored']}")
+    
+    rows = db.rebuild_grade_summary()
+    if rows is None:
+        print("✗ Erro ao reconstruir o resumo de notas.")
+    else:
+        print(f"✓ Resumo reconstruído ({rows} registros).")
+
 def main():
     """Função principal do script"""
     print("🛡️  ESCOLA ESCUDO - SISTEMA DE DADOS")
@@ -196,12 +227,13 @@ def main():
     print("1. Criar dados de exemplo")
     print("2. Mostrar estatísticas atuais")
     print("3. Resetar banco de dados (PERIGOSO)")
-    print("4. Sair")
+    print("4. Verificar/reconstruir resumo de notas")
+    print("5. Sair")
     print("-"*50)
     
     while True:
         try:
-            choice = input("Escolha uma opção (1-4): ").strip()
+            choice = input("Escolha uma opção (1-5): ").strip()
             
             if choice == '1':
                 create_sample_data()
@@ -213,6 +245,9 @@ def main():
                 reset_database()
                 break
             elif choice == '4':
+                check_grade_summary()
+                break
+            elif choice == '5':
                 print("Saindo...")
                 break
             else:
@@ -1,35 +1,140 @@
-import mysql.connector
-
-def get_mysql_connection():
-    return mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='escola_escudo'
-    )
-
 def fetch_all_students():
-    conn = get_mysql_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM students")
-    alunos = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return alunos
+    db = get_database()
+    if not db:
+        return []
+    return db.fetch_query(f"SELECT {STUDENT_COLUMNS} FROM students", row_type=StudentRow) or []
+
+def iter_all_students():
+    db = get_database()
+    if not db:
+        return iter(())
+    return db.iter_query(f"SELECT {STUDENT_COLUMNS} FROM students", row_type=StudentRow)
 import sys
 sys.path.append('c:/Users/regin/leonardoav1/Av1.-Escola/av1')
 from database import get_database
-from typing import List, Dict, Optional
+from cache import invalidate, response_cache
+from analytics import analytics
+from workers import report_executor
+from rows import StudentRow, SubjectRow, GradeRow, STUDENT_COLUMNS, SUBJECT_COLUMNS
+from functools import partial
+from itertools import chain
+from typing import List, Dict
+from decimal import Decimal
+import base64
+import json
+import threading
 import mysql.connector
 
-class Student:
+# Paginação por cursor (keyset): limite padrão e máximo por página
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    """Gera um cursor opaco a partir dos valores da chave de ordenação"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    """Decodifica um cursor opaco; lança ValueError se for inválido"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Cursor inválido')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Cursor inválido')
+    return values
+
+
+def parse_fields(fields, columns):
+    """Converte 'a,b,c' na lista de campos pedidos; lança ValueError para campos desconhecidos"""
+    if not fields:
+        return list(columns)
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in selected if field not in columns]
+    if unknown:
+        raise ValueError(f"Campo(s) inválido(s): {', '.join(unknown)}")
+    return selected
+
+
+def fetch_page(db, columns, from_sql, order_by, fields=None, cursor=None, limit=None,
+               conditions=None, params=()):
+    """Executa uma consulta paginada por keyset com projeção de campos.
+    columns mapeia campo -> expressão SQL e order_by lista os campos da
+    ordenação (únicos em conjunto). Com limit retorna {'items', 'next_cursor'};
+    sem limit retorna a lista completa projetada."""
+    selected = parse_fields(fields, columns)
+    select_fields = selected + [field for field in order_by if field not in selected]
+    
+    conditions = list(conditions or [])
+    params = list(params)
+    
+    if cursor:
+        values = decode_cursor(cursor, len(order_by))
+        # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        clauses = []
+        for i, field in enumerate(order_by):
+            parts = [f"{columns[key]} = %s" for key in order_by[:i]] + [f"{columns[field]} > %s"]
+            clauses.append("(" + " AND ".join(parts) + ")")
+            params.extend(values[:i + 1])
+        conditions.append("(" + " OR ".join(clauses) + ")")
+    
+    query = "SELECT " + ", ".join(f"{columns[field]} as {field}" for field in select_fields)
+    query += " " + from_sql
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY " + ", ".join(columns[field] for field in order_by)
+    
+    if limit is not None:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        query += f" LIMIT {limit + 1}"
+    
+    rows = db.fetch_query(query, tuple(params)) or []
+    
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][field] for field in order_by])
+    
+    items = [{field: row[field] for field in selected} for row in rows]
+    
+    if limit is None:
+        return items
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+class Model:
+    """Base dos modelos: o banco só é obtido quando o objeto consulta ou grava,
+    então montar objetos (ou listas deles) a partir de linhas não custa nada"""
+    
+    @property
+    def db(self):
+        return get_database()
+
+
+def fetch_grouped(db, query, key, ids):
+    """Executa uma consulta agregada com `IN ({placeholders})` para um lote de ids
+    e retorna {id: linha}; uma única consulta, qualquer que seja o tamanho do lote"""
+    ids = sorted({value for value in ids if value is not None})
+    if not db or not ids:
+        return {}
+    placeholders = ', '.join(['%s'] * len(ids))
+    rows = db.fetch_query(query.format(placeholders=placeholders), tuple(ids)) or []
+    return {row[key]: row for row in rows}
+
+
+class Student(Model):
     def __init__(self, id=None, name=None, email=None, age=None, student_class=None):
         self.id = id
         self.name = name
         self.email = email
         self.age = age
         self.student_class = student_class
-        self.db = get_database()
+    
+    @staticmethod
+    def from_row(row):
+        """Cria o objeto a partir de uma linha de students"""
+        return Student(row.get('id'), row.get('name'), row.get('email'), row.get('age'), row.get('class'))
     
     @staticmethod
     def get_all():
@@ -40,21 +145,34 @@ class Student:
         
         query = """
         SELECT s.*, 
-               COALESCE(AVG(g.grade), 0) as average_grade,
+               COALESCE(ROUND(SUM(st.grade_sum), 1) / SUM(st.grade_count), 0) as average_grade,
                CASE 
-                  WHEN AVG(g.grade) >= 6 THEN 'Aprovado'
-                  WHEN AVG(g.grade) >= 4 THEN 'Recuperação'
-                  WHEN AVG(g.grade) > 0 THEN 'Reprovado'
+                  WHEN ROUND(SUM(st.grade_sum), 1) / SUM(st.grade_count) >= 6 THEN 'Aprovado'
+                  WHEN ROUND(SUM(st.grade_sum), 1) / SUM(st.grade_count) >= 4 THEN 'Recuperação'
+                  WHEN ROUND(SUM(st.grade_sum), 1) / SUM(st.grade_count) > 0 THEN 'Reprovado'
                   ELSE 'Sem Notas'
                END as status
         FROM students s
-        LEFT JOIN grades g ON s.id = g.student_id
+        LEFT JOIN student_subject_stats st ON s.id = st.student_id
         GROUP BY s.id
         ORDER BY s.name
         """
         
         return db.fetch_query(query) or []
     
+    @staticmethod
+    def get_page(fields=None, cursor=None, limit=None):
+        """Retorna estudantes paginados por (name, id) com projeção de campos"""
+        db = get_database()
+        if not db:
+            return [] if limit is None else {'items': [], 'next_cursor': None}
+        
+        columns = {
+            'id': 's.id', 'name': 's.name', 'email': 's.email', 'age': 's.age',
+            'class': 's.class', 'created_at': 's.created_at', 'updated_at': 's.updated_at'
+        }
+        return fetch_page(db, columns, "FROM students s", ['name', 'id'], fields, cursor, limit)
+    
     @staticmethod
     def get_by_id(student_id: int):
         """Retorna um estudante pelo ID"""
@@ -63,12 +181,22 @@ class Student:
             return None
         
         query = "SELECT * FROM students WHERE id = %s"
-        result = db.fetch_query(query, (student_id,))
+        result = db.fetch_query(query, (student_id,), prepared=True)
         
         return result[0] if result else None
     
-    def save(self):
-        """Salva o estudante no banco de dados"""
+    def _execute(self, query, params, strict):
+        """execute_query (erros viram None) ou, com strict, um cursor que repropaga o erro"""
+        if not strict:
+            return self.db.execute_query(query, params, prepared=True)
+        with self.db.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
+    
+    def save(self, strict=False):
+        """Salva o estudante no banco de dados. Com strict=True erros do banco
+        (ex.: IntegrityError de email duplicado) são repropagados em vez de
+        retornar False."""
         if not self.db:
             return False
         
@@ -78,22 +206,30 @@ class Student:
             SET name = %s, email = %s, age = %s, class = %s 
             WHERE id = %s
             """
-            result = self.db.execute_query(
+            result = self._execute(
                 query, 
-                (self.name, self.email, self.age, self.student_class, self.id)
+                (self.name, self.email, self.age, self.student_class, self.id),
+                strict
             )
-            return result is not None
+            if result is not None:
+                invalidate('students')
+                analytics.save_student(self.id, self.name, self.student_class)
+                return True
+            return False
         else:  # Insert
             query = """
             INSERT INTO students (name, email, age, class) 
             VALUES (%s, %s, %s, %s)
             """
-            result = self.db.execute_query(
+            result = self._execute(
                 query, 
-                (self.name, self.email, self.age, self.student_class)
+                (self.name, self.email, self.age, self.student_class),
+                strict
             )
             if result:
                 self.id = result
+                invalidate('students')
+                analytics.save_student(self.id, self.name, self.student_class)
                 return True
             return False
     
@@ -103,8 +239,121 @@ class Student:
             return False
         
         query = "DELETE FROM students WHERE id = %s"
-        result = self.db.execute_query(query, (self.id,))
-        return result is not None
+        result = self.db.execute_query(query, (self.id,), prepared=True)
+        if result is not None:
+            # ON DELETE CASCADE também remove as notas do aluno
+            invalidate('students', 'grades')
+            analytics.remove_student(self.id)
+            return True
+        return False
+    
+    @staticmethod
+    def validate(data):
+        """Valida os dados de um estudante; retorna a mensagem de erro ou None"""
+        for field in ['name', 'email', 'age', 'class']:
+            if field not in data or not data[field]:
+                return f'Campo obrigatório não fornecido: {field}'
+        if not isinstance(data['age'], int) or isinstance(data['age'], bool) or data['age'] < 6 or data['age'] > 18:
+            return 'Idade deve estar entre 6 e 18 anos'
+        return None
+    
+    @staticmethod
+    def bulk_insert(rows, chunk_size=500):
+        """Importa estudantes em lotes (executemany + commit por lote).
+        Recebe um iterável de (linha, dados) e gera um resultado para cada
+        linha rejeitada e um resumo por lote gravado, sem acumular o arquivo"""
+        db = get_database()
+        if not db:
+            yield {'status': 'error', 'message': 'Erro na conexão com o banco de dados'}
+            return
+        
+        chunk = []
+        for line, data in rows:
+            if not isinstance(data, dict):
+                yield {'line': line, 'status': 'invalid', 'message': 'Linha inválida'}
+                continue
+            
+            error = Student.validate(data)
+            if error:
+                yield {'line': line, 'status': 'invalid', 'message': error}
+                continue
+            
+            chunk.append((line, data))
+            if len(chunk) >= chunk_size:
+                yield from Student._insert_chunk(db, chunk)
+                chunk = []
+        
+        if chunk:
+            yield from Student._insert_chunk(db, chunk)
+    
+    @staticmethod
+    def _insert_chunk(db, chunk):
+        """Insere um lote, reportando linha a linha os emails já cadastrados"""
+        query = "INSERT INTO students (name, email, age, class) VALUES (%s, %s, %s, %s)"
+        
+        # Emails repetidos dentro do próprio lote
+        pending = []
+        seen = set()
+        for line, data in chunk:
+            email = str(data['email']).strip().lower()
+            if email in seen:
+                yield {'line': line, 'status': 'duplicate', 'email': data['email'], 'message': 'Email já está em uso'}
+            else:
+                seen.add(email)
+                pending.append((line, data))
+        
+        if not pending:
+            yield {'status': 'chunk', 'inserted': 0}
+            return
+        
+        inserted = 0
+        duplicates = set()
+        try:
+            with db.cursor() as cursor:
+                # Emails já existentes no banco (UNIQUE em students.email)
+                placeholders = ', '.join(['%s'] * len(pending))
+                cursor.execute(
+                    f"SELECT email FROM students WHERE email IN ({placeholders})",
+                    tuple(data['email'] for _, data in pending)
+                )
+                existing = {row[0].lower() for row in cursor.fetchall()}
+                
+                rows = []
+                for line, data in pending:
+                    if str(data['email']).strip().lower() in existing:
+                        duplicates.add(line)
+                    else:
+                        rows.append((data['name'], data['email'], data['age'], data['class']))
+                
+                if rows:
+                    cursor.executemany(query, rows)
+                    inserted = len(rows)
+            
+            for line, data in pending:
+                if line in duplicates:
+                    yield {'line': line, 'status': 'duplicate', 'email': data['email'], 'message': 'Email já está em uso'}
+        
+        except mysql.connector.IntegrityError:
+            # Conflito concorrente: regrava o lote linha a linha
+            inserted = 0
+            for line, data in pending:
+                try:
+                    with db.cursor() as cursor:
+                        cursor.execute(query, (data['name'], data['email'], data['age'], data['class']))
+                    inserted += 1
+                except mysql.connector.IntegrityError:
+                    yield {'line': line, 'status': 'duplicate', 'email': data['email'], 'message': 'Email já está em uso'}
+        
+        except mysql.connector.Error as e:
+            print(f"Erro ao importar lote de estudantes: {e}")
+            yield {'status': 'error', 'lines': [line for line, _ in pending], 'message': 'Erro ao gravar lote'}
+            return
+        
+        if inserted:
+            invalidate('students')
+            # IDs gerados pelo executemany não são conhecidos: recarga completa
+            analytics.mark_stale()
+        yield {'status': 'chunk', 'inserted': inserted}
     
     def get_grades(self):
         """Retorna todas as notas do estudante"""
@@ -119,48 +368,126 @@ class Student:
         ORDER BY s.name, g.period
         """
         
-        return self.db.fetch_query(query, (self.id,)) or []
+        return self.db.fetch_query(query, (self.id,), prepared=True) or []
     
     def get_average(self):
         """Calcula a média geral do estudante"""
-        if not self.db or not self.id:
+        if not self.id:
             return 0.0
-        
-        query = "SELECT AVG(grade) as average FROM grades WHERE student_id = %s"
-        result = self.db.fetch_query(query, (self.id,))
-        
-        return float(result[0]['average']) if result and result[0]['average'] else 0.0
+        return Student.get_averages([self.id]).get(self.id, 0.0)
     
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
+    @staticmethod
+    def get_averages(student_ids):
+        """Médias gerais de vários estudantes em uma única consulta ({id: média})"""
+        query = """
+        SELECT student_id, ROUND(SUM(grade_sum), 1) / SUM(grade_count) as average
+        FROM student_subject_stats WHERE student_id IN ({placeholders})
+        GROUP BY student_id
+        """
+        rows = fetch_grouped(get_database(), query, 'student_id', student_ids)
+        return {
+            student_id: float(row['average']) if row['average'] else 0.0
+            for student_id, row in rows.items()
+        }
+    
+    def to_dict(self, average=None):
+        """Converte o objeto para dicionário (average: média já calculada em lote)"""
         return {
             'id': self.id,
             'name': self.name,
             'email': self.email,
             'age': self.age,
             'class': self.student_class,
-            'average_grade': self.get_average()
+            'average_grade': self.get_average() if average is None else average
         }
+    
+    @staticmethod
+    def to_dicts(students):
+        """Serializa uma lista de estudantes com uma consulta para todas as médias"""
+        averages = Student.get_averages([student.id for student in students])
+        return [student.to_dict(averages.get(student.id, 0.0)) for student in students]
+
+
+class SubjectCatalog:
+    """Matérias em memória (poucas linhas, quase nunca alteradas): carregadas
+    na inicialização e recarregadas quando a tag 'subjects' é invalidada"""
+    
+    QUERY = f"SELECT {SUBJECT_COLUMNS} FROM subjects ORDER BY name"
+    
+    def __init__(self):
+        self._state = None  # (geração da tag, linhas, linhas por id)
+        self._lock = threading.Lock()
+    
+    def load(self, db):
+        """Lê as matérias do banco; retorna as linhas ou None em caso de erro"""
+        generation = response_cache.generation(('subjects',))
+        rows = db.fetch_query(SubjectCatalog.QUERY, row_type=SubjectRow)
+        if rows is None:
+            return None
+        with self._lock:
+            self._state = (generation, rows, {row['id']: row for row in rows})
+        return rows
+    
+    def _current(self, db):
+        state = self._state
+        if state is None or state[0] != response_cache.generation(('subjects',)):
+            if self.load(db) is None:
+                return None
+            state = self._state
+        return state
+    
+    def all(self, db):
+        state = self._current(db)
+        return list(state[1]) if state else []
+    
+    def get(self, db, subject_id):
+        state = self._current(db)
+        return state[2].get(subject_id) if state else None
+    
+    def stats(self):
+        state = self._state
+        return {'loaded': state is not None, 'subjects': len(state[1]) if state else 0}
+
+# Instância compartilhada (pré-carregada em startup.py)
+subject_catalog = SubjectCatalog()
 
 
-class Subject:
+class Subject(Model):
     def __init__(self, id=None, name=None, teacher=None, hours_per_week=None, min_grade=6.0):
         self.id = id
         self.name = name
         self.teacher = teacher
         self.hours_per_week = hours_per_week
         self.min_grade = min_grade
-        self.db = get_database()
+    
+    @staticmethod
+    def from_row(row):
+        """Cria o objeto a partir de uma linha de subjects"""
+        min_grade = row.get('min_grade')
+        return Subject(row.get('id'), row.get('name'), row.get('teacher'), row.get('hours_per_week'),
+                       float(min_grade) if min_grade is not None else 6.0)
     
     @staticmethod
     def get_all():
-        """Retorna todas as matérias"""
+        """Retorna todas as matérias (do catálogo em memória)"""
         db = get_database()
         if not db:
             return []
         
-        query = "SELECT * FROM subjects ORDER BY name"
-        return db.fetch_query(query) or []
+        return subject_catalog.all(db)
+    
+    @staticmethod
+    def get_page(fields=None, cursor=None, limit=None):
+        """Retorna matérias paginadas por (name, id) com projeção de campos"""
+        db = get_database()
+        if not db:
+            return [] if limit is None else {'items': [], 'next_cursor': None}
+        
+        columns = {
+            'id': 'sub.id', 'name': 'sub.name', 'teacher': 'sub.teacher',
+            'hours_per_week': 'sub.hours_per_week', 'min_grade': 'sub.min_grade'
+        }
+        return fetch_page(db, columns, "FROM subjects sub", ['name', 'id'], fields, cursor, limit)
     
     @staticmethod
     def get_by_id(subject_id: str):
@@ -169,75 +496,156 @@ class Subject:
         if not db:
             return None
         
+        subject = subject_catalog.get(db, subject_id)
+        if subject is not None:
+            return subject
+        
+        # Fora do catálogo: o banco decide (a collation ignora maiúsculas)
         query = "SELECT * FROM subjects WHERE id = %s"
-        result = db.fetch_query(query, (subject_id,))
+        result = db.fetch_query(query, (subject_id,), prepared=True)
         
         return result[0] if result else None
     
     def get_class_average(self):
         """Calcula a média da turma na matéria"""
-        if not self.db or not self.id:
+        if not self.id:
             return 0.0
+        return Subject.get_class_averages([self.id]).get(self.id, 0.0)
+    
+    @staticmethod
+    def get_class_averages(subject_ids):
+        """Médias de várias matérias em uma única consulta ({id: média})"""
+        query = """
+        SELECT subject_id, ROUND(SUM(grade_sum), 1) / SUM(grade_count) as average
+        FROM student_subject_stats WHERE subject_id IN ({placeholders})
+        GROUP BY subject_id
+        """
+        rows = fetch_grouped(get_database(), query, 'subject_id', subject_ids)
+        return {
+            subject_id: float(row['average']) if row['average'] else 0.0
+            for subject_id, row in rows.items()
+        }
+    
+    @staticmethod
+    def get_stats(subject_id: str = None):
+        """Calcula, em uma única passada, as estatísticas de todas as matérias
+        (ou de uma só): alunos avaliados, aprovados, em recuperação,
+        reprovados e média da turma, usando o min_grade de cada matéria"""
+        db = get_database()
+        if not db:
+            return []
         
-        query = "SELECT AVG(grade) as average FROM grades WHERE subject_id = %s"
-        result = self.db.fetch_query(query, (self.id,))
+        if analytics.ensure_loaded(db):
+            return analytics.subject_stats(subject_id)
         
-        return float(result[0]['average']) if result and result[0]['average'] else 0.0
+        query, params = Subject.stats_query(subject_id)
+        return Subject.build_stats(db.fetch_query(query, params, prepared=True) or [])
     
-    def get_approval_stats(self):
-        """Retorna estatísticas de aprovação da matéria"""
-        if not self.db or not self.id:
-            return {'total': 0, 'approved': 0, 'failed': 0, 'approval_rate': 0}
-        
+    @staticmethod
+    def stats_query(subject_id: str = None):
+        """Consulta (e parâmetros) usada por get_stats"""
         query = """
-        SELECT 
-            COUNT(DISTINCT s.id) as total_students,
-            COUNT(DISTINCT CASE WHEN AVG(g.grade) >= 6 THEN s.id END) as approved,
-            COUNT(DISTINCT CASE WHEN AVG(g.grade) < 6 AND AVG(g.grade) > 0 THEN s.id END) as failed
-        FROM students s
-        LEFT JOIN grades g ON s.id = g.student_id AND g.subject_id = %s
-        GROUP BY g.subject_id
+        SELECT sub.id, sub.name, sub.teacher, sub.min_grade,
+               COUNT(ss.student_id) as total_students,
+               COALESCE(SUM(CASE WHEN ss.average >= COALESCE(sub.min_grade, 6) THEN 1 ELSE 0 END), 0) as approved,
+               COALESCE(SUM(CASE WHEN ss.average < COALESCE(sub.min_grade, 6) AND ss.average >= 4 THEN 1 ELSE 0 END), 0) as recovery,
+               COALESCE(SUM(CASE WHEN ss.average < COALESCE(sub.min_grade, 6) AND ss.average < 4 AND ss.average > 0 THEN 1 ELSE 0 END), 0) as failed,
+               ROUND(SUM(ss.grade_sum), 1) / SUM(ss.grade_count) as class_average
+        FROM subjects sub
+        LEFT JOIN student_subject_stats ss ON ss.subject_id = sub.id AND ss.grade_count > 0
         """
+        params = ()
         
-        result = self.db.fetch_query(query, (self.id,))
+        if subject_id:
+            query += " WHERE sub.id = %s"
+            params = (subject_id,)
         
-        if result and result[0]:
-            stats = result[0]
-            total = stats['total_students']
-            approved = stats['approved'] or 0
-            failed = stats['failed'] or 0
+        query += " GROUP BY sub.id, sub.name, sub.teacher, sub.min_grade ORDER BY sub.name"
+        
+        return query, params
+    
+    @staticmethod
+    def build_stats(result):
+        """Converte as linhas de stats_query nas estatísticas por matéria"""
+        stats = []
+        for row in result:
+            total = int(row['total_students'] or 0)
+            approved = int(row['approved'])
             approval_rate = (approved / total * 100) if total > 0 else 0
             
-            return {
-                'total': total,
+            stats.append({
+                'id': row['id'],
+                'name': row['name'],
+                'teacher': row['teacher'],
+                'min_grade': float(row['min_grade']) if row['min_grade'] is not None else 6.0,
+                'total_students': total,
                 'approved': approved,
-                'failed': failed,
+                'recovery': int(row['recovery']),
+                'failed': int(row['failed']),
+                'class_average': round(float(row['class_average']), 1) if row['class_average'] else 0.0,
                 'approval_rate': round(approval_rate, 1)
-            }
+            })
         
-        return {'total': 0, 'approved': 0, 'failed': 0, 'approval_rate': 0}
+        return stats
     
-    def to_dict(self):
-        """Converte o objeto para dicionário"""
+    def get_approval_stats(self):
+        """Retorna estatísticas de aprovação da matéria"""
+        if not self.db or not self.id:
+            return Subject.approval_stats_from(None)
+        
+        result = Subject.get_stats(self.id)
+        return Subject.approval_stats_from(result[0] if result else None)
+    
+    @staticmethod
+    def approval_stats_from(stats):
+        """Recorte de aprovação de uma linha de get_stats (zeros se não houver)"""
+        if not stats:
+            return {'total': 0, 'approved': 0, 'recovery': 0, 'failed': 0, 'approval_rate': 0}
+        return {
+            'total': stats['total_students'],
+            'approved': stats['approved'],
+            'recovery': stats['recovery'],
+            'failed': stats['failed'],
+            'approval_rate': stats['approval_rate']
+        }
+    
+    def to_dict(self, class_average=None, approval_stats=None):
+        """Converte o objeto para dicionário (campos derivados podem vir calculados em lote)"""
         return {
             'id': self.id,
             'name': self.name,
             'teacher': self.teacher,
             'hours_per_week': self.hours_per_week,
             'min_grade': self.min_grade,
-            'class_average': self.get_class_average(),
-            'approval_stats': self.get_approval_stats()
+            'class_average': self.get_class_average() if class_average is None else class_average,
+            'approval_stats': self.get_approval_stats() if approval_stats is None else approval_stats
         }
+    
+    @staticmethod
+    def to_dicts(subjects):
+        """Serializa uma lista de matérias com duas consultas no total: médias e
+        estatísticas de aprovação de todas as matérias do lote"""
+        averages = Subject.get_class_averages([subject.id for subject in subjects])
+        wanted = {subject.id for subject in subjects}
+        stats = {row['id']: row for row in Subject.get_stats() if row['id'] in wanted} if subjects else {}
+        return [
+            subject.to_dict(averages.get(subject.id, 0.0), Subject.approval_stats_from(stats.get(subject.id)))
+            for subject in subjects
+        ]
 
 
-class Grade:
+class Grade(Model):
     def __init__(self, id=None, student_id=None, subject_id=None, period=None, grade=None):
         self.id = id
         self.student_id = student_id
         self.subject_id = subject_id
         self.period = period
         self.grade = grade
-        self.db = get_database()
+    
+    @staticmethod
+    def from_row(row):
+        """Cria o objeto a partir de uma linha de grades"""
+        return Grade(row.get('id'), row.get('student_id'), row.get('subject_id'), row.get('period'), row.get('grade'))
     
     @staticmethod
     def get_all():
@@ -247,14 +655,53 @@ class Grade:
             return []
         
         query = """
-        SELECT g.*, s.name as student_name, sub.name as subject_name
+        SELECT g.id, g.student_id, g.subject_id, g.period, g.grade, g.created_at, g.updated_at,
+               s.name as student_name, sub.name as subject_name
         FROM grades g
         JOIN students s ON g.student_id = s.id
         JOIN subjects sub ON g.subject_id = sub.id
         ORDER BY s.name, sub.name, g.period
         """
         
-        return db.fetch_query(query) or []
+        return db.fetch_query(query, row_type=GradeRow) or []
+    
+    @staticmethod
+    def get_page(fields=None, cursor=None, limit=None, student_id=None, subject_id=None):
+        """Retorna notas paginadas pela chave unique_grade (student_id, subject_id,
+        period) com projeção de campos; os JOINs só entram se os nomes forem pedidos"""
+        db = get_database()
+        if not db:
+            return [] if limit is None else {'items': [], 'next_cursor': None}
+        
+        columns = {
+            'id': 'g.id', 'student_id': 'g.student_id', 'subject_id': 'g.subject_id',
+            'period': 'g.period', 'grade': 'g.grade',
+            'created_at': 'g.created_at', 'updated_at': 'g.updated_at',
+            'student_name': 's.name', 'subject_name': 'sub.name'
+        }
+        selected = parse_fields(fields, columns)
+        
+        from_sql = "FROM grades g"
+        if 'student_name' in selected:
+            from_sql += " JOIN students s ON g.student_id = s.id"
+        if 'subject_name' in selected:
+            from_sql += " JOIN subjects sub ON g.subject_id = sub.id"
+        
+        conditions = []
+        params = []
+        
+        if student_id:
+            conditions.append("g.student_id = %s")
+            params.append(student_id)
+        
+        if subject_id:
+            conditions.append("g.subject_id = %s")
+            params.append(subject_id)
+        
+        return fetch_page(
+            db, columns, from_sql, ['student_id', 'subject_id', 'period'],
+            ",".join(selected), cursor, limit, conditions, params
+        )
     
     @staticmethod
     def get_by_filters(student_id=None, subject_id=None):
@@ -264,7 +711,42 @@ class Grade:
             return []
         
         query = """
-        SELECT g.*, s.name as student_name, sub.name as subject_name
+        SELECT g.id, g.student_id, g.subject_id, g.period, g.grade, g.created_at, g.updated_at,
+               s.name as student_name, sub.name as subject_name
+        FROM grades g
+        JOIN students s ON g.student_id = s.id
+        JOIN subjects sub ON g.subject_id = sub.id
+        """
+        
+        conditions = []
+        params = []
+        
+        if student_id:
+            conditions.append("g.student_id = %s")
+            params.append(student_id)
+        
+        if subject_id:
+            conditions.append("g.subject_id = %s")
+            params.append(subject_id)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY s.name, sub.name, g.period"
+        
+        return db.fetch_query(query, tuple(params), row_type=GradeRow) or []
+    
+    @staticmethod
+    def iter_by_filters(student_id=None, subject_id=None):
+        """Versão em streaming de get_by_filters/get_all: gera as notas
+        conforme chegam do servidor, sem montar a lista em memória"""
+        db = get_database()
+        if not db:
+            return iter(())
+        
+        query = """
+        SELECT g.id, g.student_id, g.subject_id, g.period, g.grade, g.created_at, g.updated_at,
+               s.name as student_name, sub.name as subject_name
         FROM grades g
         JOIN students s ON g.student_id = s.id
         JOIN subjects sub ON g.subject_id = sub.id
@@ -286,7 +768,7 @@ class Grade:
         
         query += " ORDER BY s.name, sub.name, g.period"
         
-        return db.fetch_query(query, tuple(params)) or []
+        return db.iter_query(query, tuple(params), row_type=GradeRow)
     
     @staticmethod
     def get_student_subject_grades(student_id: int, subject_id: str):
@@ -301,48 +783,221 @@ class Grade:
         ORDER BY period
         """
         
-        return db.fetch_query(query, (student_id, subject_id)) or []
+        return db.fetch_query(query, (student_id, subject_id), prepared=True) or []
     
     def save(self):
         """Salva a nota no banco de dados (insert ou update)"""
         if not self.db:
             return False
         
-        # Verificar se já existe uma nota para este aluno, matéria e período
-        existing_query = """
-        SELECT id FROM grades 
-        WHERE student_id = %s AND subject_id = %s AND period = %s
-        """
-        
-        existing = self.db.fetch_query(
-            existing_query, 
-            (self.student_id, self.subject_id, self.period)
-        )
-        
-        if existing:  # Update
-            query = """
-            UPDATE grades 
-            SET grade = %s, updated_at = CURRENT_TIMESTAMP 
-            WHERE student_id = %s AND subject_id = %s AND period = %s
+        # Nota e resumo aluno × matéria são gravados na mesma transação
+        try:
+            with self.db.cursor(dictionary=True) as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, grade FROM grades 
+                    WHERE student_id = %s AND subject_id = %s AND period = %s
+                    FOR UPDATE
+                    """,
+                    (self.student_id, self.subject_id, self.period)
+                )
+                existing = cursor.fetchone()
+                
+                if existing:  # Update
+                    cursor.execute(
+                        """
+                        UPDATE grades 
+                        SET grade = %s, updated_at = CURRENT_TIMESTAMP 
+                        WHERE id = %s
+                        """,
+                        (self.grade, existing['id'])
+                    )
+                    self.id = existing['id']
+                    delta_sum = Decimal(str(self.grade)) - existing['grade']
+                    delta_count = 0
+                else:  # Insert
+                    cursor.execute(
+                        """
+                        INSERT INTO grades (student_id, subject_id, period, grade) 
+                        VALUES (%s, %s, %s, %s)
+                        """,
+                        (self.student_id, self.subject_id, self.period, self.grade)
+                    )
+                    self.id = cursor.lastrowid
+                    delta_sum = Decimal(str(self.grade))
+                    delta_count = 1
+                
+                Grade.update_summary(cursor, self.student_id, self.subject_id, delta_sum, delta_count)
+            
+            invalidate('grades')
+            analytics.apply_grades([(self.student_id, self.subject_id, delta_sum, delta_count)])
+            return True
+            
+        except mysql.connector.Error as e:
+            print(f"Erro ao salvar nota: {e}")
+            return False
+    
+    @staticmethod
+    def update_summary(cursor, student_id: int, subject_id: str, delta_sum, delta_count: int):
+        """Aplica a variação de soma/quantidade de notas ao resumo aluno × matéria
+        (deve ser chamado dentro da transação que alterou a tabela grades)"""
+        cursor.execute(
             """
-            result = self.db.execute_query(
-                query, 
-                (self.grade, self.student_id, self.subject_id, self.period)
-            )
-            self.id = existing[0]['id']
-        else:  # Insert
-            query = """
-            INSERT INTO grades (student_id, subject_id, period, grade) 
+            INSERT INTO student_subject_stats (student_id, subject_id, grade_sum, grade_count)
             VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                grade_sum = ROUND(grade_sum + VALUES(grade_sum), 1),
+                grade_count = grade_count + VALUES(grade_count)
+            """,
+            (student_id, subject_id, delta_sum, delta_count)
+        )
+        # Sem UPDATE ... JOIN (indisponível no SQLite): min_grade vem de subconsulta
+        cursor.execute(
             """
-            result = self.db.execute_query(
-                query, 
-                (self.student_id, self.subject_id, self.period, self.grade)
-            )
-            if result:
-                self.id = result
+            UPDATE student_subject_stats
+            SET average = CASE WHEN grade_count > 0 THEN ROUND(grade_sum / grade_count, 4) ELSE 0 END,
+                status = CASE
+                   WHEN grade_count = 0 THEN 'Sem Notas'
+                   WHEN ROUND(grade_sum / grade_count, 4) >= COALESCE((SELECT min_grade FROM subjects WHERE id = subject_id), 6) THEN 'Aprovado'
+                   WHEN ROUND(grade_sum / grade_count, 4) >= 4 THEN 'Recuperação'
+                   WHEN ROUND(grade_sum / grade_count, 4) > 0 THEN 'Reprovado'
+                   ELSE 'Sem Notas'
+                END
+            WHERE student_id = %s AND subject_id = %s
+            """,
+            (student_id, subject_id)
+        )
+    
+    @staticmethod
+    def save_grid(subject_id: str, cells: List[Dict], period: int = None):
+        """Salva uma planilha de notas (alunos × bimestres) de uma matéria.
+        Compara com as notas gravadas e grava apenas as células alteradas com
+        um único INSERT ... ON DUPLICATE KEY UPDATE, em uma transação.
+        Retorna o resultado de validação/gravação de cada célula."""
+        db = get_database()
+        if not db:
+            return None
+        
+        results = []
+        valid = {}
+        
+        # Validação célula a célula (mesmas regras de POST /api/grades)
+        for index, cell in enumerate(cells):
+            cell = cell if isinstance(cell, dict) else {}
+            student_id = cell.get('student_id')
+            cell_period = cell.get('period', period)
+            grade = cell.get('grade')
+            result = {'index': index, 'student_id': student_id, 'period': cell_period, 'grade': grade}
+            results.append(result)
+            
+            if not isinstance(student_id, int) or isinstance(student_id, bool):
+                result.update(status='invalid', message='Campo obrigatório não fornecido: student_id')
+            elif not isinstance(cell_period, int) or not (1 <= cell_period <= 4):
+                result.update(status='invalid', message='Período deve estar entre 1 e 4')
+            elif not isinstance(grade, (int, float)) or isinstance(grade, bool) or not (0 <= grade <= 10):
+                result.update(status='invalid', message='Nota deve estar entre 0 e 10')
+            elif (student_id, cell_period) in valid:
+                result.update(status='invalid', message='Célula duplicada na planilha')
+            else:
+                valid[(student_id, cell_period)] = (result, Decimal(str(round(grade, 1))))
+        
+        if not valid:
+            return results
+        
+        student_ids = sorted({student_id for student_id, _ in valid})
+        placeholders = ', '.join(['%s'] * len(student_ids))
         
-        return result is not None
+        try:
+            with db.cursor(dictionary=True) as cursor:
+                cursor.execute("SELECT id FROM subjects WHERE id = %s", (subject_id,))
+                if not cursor.fetchone():
+                    for result, _ in valid.values():
+                        result.update(status='invalid', message='Matéria não encontrada')
+                    return results
+                
+                cursor.execute(
+                    f"SELECT id FROM students WHERE id IN ({placeholders})",
+                    tuple(student_ids)
+                )
+                existing_students = {row['id'] for row in cursor.fetchall()}
+                
+                cursor.execute(
+                    f"""
+                    SELECT student_id, period, grade FROM grades
+                    WHERE subject_id = %s AND student_id IN ({placeholders})
+                    FOR UPDATE
+                    """,
+                    (subject_id, *student_ids)
+                )
+                stored = {(row['student_id'], row['period']): row['grade'] for row in cursor.fetchall()}
+                
+                changes = []
+                for key, (result, grade) in valid.items():
+                    if key[0] not in existing_students:
+                        result.update(status='invalid', message='Estudante não encontrado')
+                    elif key not in stored:
+                        result['status'] = 'created'
+                        changes.append((key[0], subject_id, key[1], grade))
+                    elif stored[key] != grade:
+                        result['status'] = 'updated'
+                        changes.append((key[0], subject_id, key[1], grade))
+                    else:
+                        result['status'] = 'unchanged'
+                
+                if changes:
+                    values = ', '.join(['(%s, %s, %s, %s)'] * len(changes))
+                    cursor.execute(
+                        f"""
+                        INSERT INTO grades (student_id, subject_id, period, grade)
+                        VALUES {values}
+                        ON DUPLICATE KEY UPDATE grade = VALUES(grade), updated_at = CURRENT_TIMESTAMP
+                        """,
+                        tuple(value for change in changes for value in change)
+                    )
+                    Grade.refresh_summary(cursor, subject_id, sorted({change[0] for change in changes}))
+            
+            if changes:
+                invalidate('grades')
+                analytics.apply_grades([
+                    (student_id, subject_id, grade - stored.get((student_id, period), 0), 0 if (student_id, period) in stored else 1)
+                    for student_id, _, period, grade in changes
+                ])
+            
+        except mysql.connector.Error as e:
+            print(f"Erro ao salvar planilha de notas: {e}")
+            for result, _ in valid.values():
+                if result.get('status') != 'invalid':
+                    result.update(status='error', message='Erro ao salvar nota')
+        
+        return results
+    
+    @staticmethod
+    def refresh_summary(cursor, subject_id: str, student_ids: List[int]):
+        """Recalcula o resumo aluno × matéria de vários alunos em uma matéria
+        (deve ser chamado dentro da transação que alterou a tabela grades)"""
+        placeholders = ', '.join(['%s'] * len(student_ids))
+        cursor.execute(
+            f"""
+            INSERT INTO student_subject_stats (student_id, subject_id, grade_sum, grade_count, average, status)
+            SELECT g.student_id, g.subject_id, ROUND(SUM(g.grade), 1), COUNT(*), ROUND(AVG(g.grade), 4),
+                   CASE
+                      WHEN ROUND(AVG(g.grade), 4) >= COALESCE(sub.min_grade, 6) THEN 'Aprovado'
+                      WHEN ROUND(AVG(g.grade), 4) >= 4 THEN 'Recuperação'
+                      WHEN ROUND(AVG(g.grade), 4) > 0 THEN 'Reprovado'
+                      ELSE 'Sem Notas'
+                   END
+            FROM grades g
+            JOIN subjects sub ON g.subject_id = sub.id
+            WHERE g.subject_id = %s AND g.student_id IN ({placeholders})
+            GROUP BY g.student_id, g.subject_id, sub.min_grade
+            ON DUPLICATE KEY UPDATE
+                grade_sum = VALUES(grade_sum),
+                grade_count = VALUES(grade_count),
+                average = VALUES(average),
+                status = VALUES(status)
+            """,
+            (subject_id, *student_ids)
+        )
     
     @staticmethod
     def calculate_subject_average(student_id: int, subject_id: str):
@@ -359,8 +1014,12 @@ class Grade:
     def get_student_status(student_id: int, subject_id: str):
         """Determina o status do aluno na matéria"""
         average = Grade.calculate_subject_average(student_id, subject_id)
-        
-        if average >= 6:
+        return Grade.status_for(average)
+    
+    @staticmethod
+    def status_for(average, min_grade=6):
+        """Status correspondente a uma média, dado o mínimo de aprovação da matéria"""
+        if average >= min_grade:
             return 'Aprovado'
         elif average >= 4:
             return 'Recuperação'
@@ -369,6 +1028,67 @@ class Grade:
         else:
             return 'Sem Notas'
     
+    @staticmethod
+    def get_student_scorecard(student_id: int, subject_id: str = None):
+        """Retorna, em uma única consulta, as notas por bimestre, a média e o
+        status de um aluno em cada matéria (ou em uma só). Retorna None se o
+        aluno não existir."""
+        db = get_database()
+        if not db:
+            return None
+        
+        query = """
+        SELECT sub.id as subject_id, sub.name as subject_name, sub.min_grade,
+               g.id, g.student_id, g.period, g.grade, g.created_at, g.updated_at
+        FROM students s
+        CROSS JOIN subjects sub
+        LEFT JOIN grades g ON g.student_id = s.id AND g.subject_id = sub.id
+        WHERE s.id = %s
+        """
+        params = [student_id]
+        
+        if subject_id:
+            query += " AND sub.id = %s"
+            params.append(subject_id)
+        
+        query += " ORDER BY sub.name, g.period"
+        
+        rows = db.fetch_query(query, tuple(params), prepared=True)
+        if not rows:
+            return None
+        
+        scorecard = []
+        current = None
+        
+        for row in rows:
+            if current is None or current['subject_id'] != row['subject_id']:
+                current = {
+                    'subject_id': row['subject_id'],
+                    'name': row['subject_name'],
+                    'min_grade': float(row['min_grade']) if row['min_grade'] is not None else 6.0,
+                    'grades': []
+                }
+                scorecard.append(current)
+            
+            if row['id'] is not None:
+                current['grades'].append({
+                    'id': row['id'],
+                    'student_id': row['student_id'],
+                    'subject_id': row['subject_id'],
+                    'period': row['period'],
+                    'grade': row['grade'],
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at']
+                })
+        
+        for subject in scorecard:
+            grades = subject['grades']
+            average = round(sum(float(grade['grade']) for grade in grades) / len(grades), 1) if grades else 0.0
+            subject['average'] = average
+            subject['status'] = Grade.status_for(average, subject['min_grade'])
+        
+        return scorecard
+    
     def to_dict(self):
         """Converte o objeto para dicionário"""
         return {
@@ -381,6 +1101,16 @@ class Grade:
 
 
 class Dashboard:
+    # Consultas independentes (podem ser executadas em paralelo no modo assíncrono)
+    COUNT_STUDENTS_QUERY = "SELECT COUNT(*) as total FROM students"
+    COUNT_SUBJECTS_QUERY = "SELECT COUNT(*) as total FROM subjects"
+    AVERAGES_QUERY = """
+        SELECT st.student_id as id, ROUND(SUM(st.grade_sum), 1) / SUM(st.grade_count) as avg_grade
+        FROM student_subject_stats st
+        GROUP BY st.student_id
+        HAVING SUM(st.grade_count) > 0
+        """
+    
     @staticmethod
     def get_stats():
         """Retorna estatísticas para o dashboard"""
@@ -388,35 +1118,33 @@ class Dashboard:
         if not db:
             return {}
         
+        if analytics.ensure_loaded(db):
+            return analytics.dashboard_stats()
+        
+        students = db.fetch_query(Dashboard.COUNT_STUDENTS_QUERY, prepared=True)
+        subjects = db.fetch_query(Dashboard.COUNT_SUBJECTS_QUERY, prepared=True)
+        averages = db.fetch_query(Dashboard.AVERAGES_QUERY, prepared=True)
+        
+        return Dashboard.build_stats(students, subjects, averages)
+    
+    @staticmethod
+    def build_stats(students, subjects, averages):
+        """Monta as estatísticas do dashboard a partir das três consultas"""
         stats = {}
         
         # Total de estudantes
-        query = "SELECT COUNT(*) as total FROM students"
-        result = db.fetch_query(query)
-        stats['total_students'] = result[0]['total'] if result else 0
+        stats['total_students'] = students[0]['total'] if students else 0
         
         # Total de matérias
-        query = "SELECT COUNT(*) as total FROM subjects"
-        result = db.fetch_query(query)
-        stats['total_subjects'] = result[0]['total'] if result else 0
+        stats['total_subjects'] = subjects[0]['total'] if subjects else 0
         
         # Estatísticas de aprovação
-        query = """
-        SELECT s.id, AVG(g.grade) as avg_grade
-        FROM students s
-        LEFT JOIN grades g ON s.id = g.student_id
-        GROUP BY s.id
-        HAVING avg_grade IS NOT NULL
-        """
-        
-        result = db.fetch_query(query)
-        
-        if result:
+        if averages:
             approved = 0
             total_avg = 0
-            students_with_grades = len(result)
+            students_with_grades = len(averages)
             
-            for student in result:
+            for student in averages:
                 avg = float(student['avg_grade'])
                 total_avg += avg
                 if avg >= 6:
@@ -432,22 +1160,86 @@ class Dashboard:
 
 
 class Reports:
+    # {where} recebe '' (escola) ou o filtro de turma (parâmetro %s); as
+    # variantes *_CLASS_QUERY são as mesmas consultas restritas a uma turma
+    STATS_TEMPLATE = """
+        SELECT s.id, s.{column}, ROUND(SUM(st.grade_sum), 1) / SUM(st.grade_count) as avg_grade
+        FROM students s
+        LEFT JOIN student_subject_stats st ON s.id = st.student_id
+        {where}
+        GROUP BY s.id, s.{column}
+        """
+    
+    STUDENT_REPORT_TEMPLATE = """
+        SELECT s.id, s.name, s.class, st.subject_id, st.average
+        FROM students s
+        LEFT JOIN student_subject_stats st ON s.id = st.student_id AND st.grade_count > 0
+        {where}
+        ORDER BY s.name, s.id
+        """
+    
+    CLASS_FILTER = "WHERE s.class = %s"
+    
+    GENERAL_STATS_QUERY = STATS_TEMPLATE.format(column='name', where='')
+    GENERAL_STATS_CLASS_QUERY = STATS_TEMPLATE.format(column='name', where=CLASS_FILTER)
+    CLASS_STATS_QUERY = STATS_TEMPLATE.format(column='class', where='')
+    CLASS_STATS_CLASS_QUERY = STATS_TEMPLATE.format(column='class', where=CLASS_FILTER)
+    STUDENT_REPORT_QUERY = STUDENT_REPORT_TEMPLATE.format(where='')
+    STUDENT_REPORT_CLASS_QUERY = STUDENT_REPORT_TEMPLATE.format(where=CLASS_FILTER)
+    
+    @staticmethod
+    def get_classes():
+        """Turmas com alunos cadastrados (partições dos relatórios)"""
+        db = get_database()
+        if not db:
+            return []
+        return [row['class'] for row in db.fetch_query("SELECT DISTINCT class FROM students ORDER BY class") or []]
+    
     @staticmethod
-    def get_general_stats():
-        """Retorna estatísticas gerais de aprovação"""
+    def get_general_stats(student_class: str = None):
+        """Retorna estatísticas gerais de aprovação (da escola ou de uma turma).
+        Sem o motor analítico, a escola é calculada turma a turma em paralelo."""
         db = get_database()
         if not db:
             return {'approved': 0, 'failed': 0, 'recovery': 0, 'approval_rate': 0}
         
-        query = """
-        SELECT s.id, s.name, AVG(g.grade) as avg_grade
-        FROM students s
-        LEFT JOIN grades g ON s.id = g.student_id
-        GROUP BY s.id
-        """
+        if analytics.ensure_loaded(db):
+            return analytics.general_stats(student_class)
+        
+        if student_class is not None:
+            return Reports.general_stats_partition(student_class)
         
-        result = db.fetch_query(query)
+        if report_executor.parallel:
+            return Reports.merge_general_stats(report_executor.map(Reports.general_stats_partition, Reports.get_classes()))
         
+        return Reports.build_general_stats(db.fetch_query(Reports.GENERAL_STATS_QUERY, prepared=True))
+    
+    @staticmethod
+    def general_stats_partition(student_class: str):
+        """Estatísticas gerais de uma turma (executada em um worker)"""
+        db = get_database()
+        if not db:
+            return Reports.build_general_stats([])
+        return Reports.build_general_stats(db.fetch_query(Reports.GENERAL_STATS_CLASS_QUERY, (student_class,), prepared=True))
+    
+    @staticmethod
+    def merge_general_stats(parts):
+        """Soma as estatísticas gerais das turmas"""
+        approved = sum(part['approved'] for part in parts)
+        failed = sum(part['failed'] for part in parts)
+        recovery = sum(part['recovery'] for part in parts)
+        total = approved + failed + recovery
+        
+        return {
+            'approved': approved,
+            'failed': failed,
+            'recovery': recovery,
+            'approval_rate': round((approved / total) * 100, 1) if total > 0 else 0
+        }
+    
+    @staticmethod
+    def build_general_stats(result):
+        """Classifica as médias por aluno em aprovados, recuperação e reprovados"""
         if not result:
             return {'approved': 0, 'failed': 0, 'recovery': 0, 'approval_rate': 0}
         
@@ -476,77 +1268,182 @@ class Reports:
         }
     
     @staticmethod
-    def get_student_report():
-        """Retorna relatório detalhado por estudante"""
+    def get_class_report(student_class: str = None):
+        """Retorna a aprovação por turma (de todas ou de uma só)"""
         db = get_database()
         if not db:
             return []
         
-        # Buscar todos os estudantes
-        students = Student.get_all()
-        subjects = Subject.get_all()
+        if analytics.ensure_loaded(db):
+            return analytics.class_stats(student_class)
+        
+        if student_class is not None:
+            return Reports.class_report_partition(student_class)
+        
+        if report_executor.parallel:
+            parts = report_executor.map(Reports.class_report_partition, Reports.get_classes())
+            return sorted(chain.from_iterable(parts), key=lambda entry: entry['class'])
+        
+        return Reports.build_class_report(db.fetch_query(Reports.CLASS_STATS_QUERY, prepared=True))
+    
+    @staticmethod
+    def class_report_partition(student_class: str):
+        """Linha do relatório por turma de uma turma (executada em um worker)"""
+        db = get_database()
+        if not db:
+            return []
+        return Reports.build_class_report(db.fetch_query(Reports.CLASS_STATS_CLASS_QUERY, (student_class,), prepared=True))
+    
+    @staticmethod
+    def build_class_report(result):
+        """Agrupa as médias por aluno em turmas, com os critérios do relatório geral"""
+        classes = {}
+        for student in result or []:
+            classes.setdefault(student['class'], []).append(student)
         
         report = []
+        for student_class in sorted(classes):
+            students = classes[student_class]
+            averages = [float(student['avg_grade']) for student in students if student['avg_grade'] is not None]
+            report.append({
+                'class': student_class,
+                'total_students': len(students),
+                'students_with_grades': len(averages),
+                **Reports.build_general_stats(students),
+                'average_grade': round(sum(averages) / len(averages), 1) if averages else 0
+            })
+        
+        return report
+    
+    @staticmethod
+    def get_student_report(student_class: str = None):
+        """Retorna relatório detalhado por estudante (da escola ou de uma turma).
+        Sem o motor analítico, a escola é calculada turma a turma em paralelo."""
+        db = get_database()
+        if not db:
+            return []
+        
+        if student_class is None and report_executor.parallel and not analytics.ensure_loaded(db):
+            subjects = Subject.get_all()
+            parts = report_executor.map(partial(Reports.student_report_partition, subjects=subjects), Reports.get_classes())
+            return Reports.merge_student_report(db, parts)
+        
+        return list(Reports.iter_student_report(student_class))
+    
+    @staticmethod
+    def iter_student_report(student_class: str = None):
+        """Gera o relatório por estudante um aluno por vez, a partir de uma
+        leitura em streaming do resumo (aluno × matéria)"""
+        db = get_database()
+        if not db:
+            return
+        
+        if analytics.ensure_loaded(db):
+            yield from analytics.iter_student_report(student_class)
+            return
+        
+        subjects = Subject.get_all()
+        
+        if student_class is None:
+            rows = db.iter_query(Reports.STUDENT_REPORT_QUERY)
+        else:
+            rows = db.iter_query(Reports.STUDENT_REPORT_CLASS_QUERY, (student_class,))
         
-        for student in students:
-            student_data = {
-                'id': student['id'],
-                'name': student['name'],
-                'class': student['class'],
-                'subjects': {},
-                'general_average': 0,
-                'status': 'Sem Notas'
+        yield from Reports.group_student_report(rows, subjects)
+    
+    @staticmethod
+    def student_report_partition(student_class: str, subjects):
+        """Relatório por estudante de uma turma (executada em um worker)"""
+        db = get_database()
+        if not db:
+            return []
+        rows = db.fetch_query(Reports.STUDENT_REPORT_CLASS_QUERY, (student_class,), prepared=True)
+        return list(Reports.group_student_report(rows or [], subjects))
+    
+    @staticmethod
+    def merge_student_report(db, parts):
+        """Junta as turmas na ordem (name, id) da collation do banco, como a consulta única"""
+        rows = db.fetch_query("SELECT id FROM students ORDER BY name, id") or []
+        position = {row['id']: index for index, row in enumerate(rows)}
+        return sorted(chain.from_iterable(parts), key=lambda entry: position.get(entry['id'], len(position)))
+    
+    @staticmethod
+    def group_student_report(rows, subjects):
+        """Agrupa as linhas de STUDENT_REPORT_QUERY em uma entrada por aluno"""
+        # As linhas chegam ordenadas por aluno: cada grupo consecutivo é um aluno
+        student = None
+        averages = {}
+        
+        for row in rows:
+            if student is None or row['id'] != student['id']:
+                if student is not None:
+                    yield Reports._build_student_entry(student, averages, subjects)
+                student = row
+                averages = {}
+            if row['subject_id'] is not None:
+                averages[row['subject_id']] = round(float(row['average']), 1)
+        
+        if student is not None:
+            yield Reports._build_student_entry(student, averages, subjects)
+    
+    @staticmethod
+    def _build_student_entry(student, averages, subjects):
+        """Monta a linha do relatório de um aluno a partir das médias por matéria"""
+        student_data = {
+            'id': student['id'],
+            'name': student['name'],
+            'class': student['class'],
+            'subjects': {},
+            'general_average': 0,
+            'status': 'Sem Notas'
+        }
+        
+        total_avg = 0
+        subject_count = 0
+        
+        for subject in subjects:
+            avg = averages.get(subject['id'], 0.0)
+            student_data['subjects'][subject['id']] = {
+                'name': subject['name'],
+                'average': avg
             }
             
-            total_avg = 0
-            subject_count = 0
-            
-            for subject in subjects:
-                avg = Grade.calculate_subject_average(student['id'], subject['id'])
-                student_data['subjects'][subject['id']] = {
-                    'name': subject['name'],
-                    'average': avg
-                }
-                
-                if avg > 0:
-                    total_avg += avg
-                    subject_count += 1
-            
-            if subject_count > 0:
-                general_avg = round(total_avg / subject_count, 1)
-                student_data['general_average'] = general_avg
-                
-                if general_avg >= 6:
-                    student_data['status'] = 'Aprovado'
-                elif general_avg >= 4:
-                    student_data['status'] = 'Recuperação'
-                else:
-                    student_data['status'] = 'Reprovado'
+            if avg > 0:
+                total_avg += avg
+                subject_count += 1
+        
+        if subject_count > 0:
+            general_avg = round(total_avg / subject_count, 1)
+            student_data['general_average'] = general_avg
             
-            report.append(student_data)
+            if general_avg >= 6:
+                student_data['status'] = 'Aprovado'
+            elif general_avg >= 4:
+                student_data['status'] = 'Recuperação'
+            else:
+                student_data['status'] = 'Reprovado'
         
-        return report
+        return student_data
     
     @staticmethod
     def get_subject_report():
         """Retorna relatório por matéria"""
-        subjects = Subject.get_all()
-        
-        report = []
-        
-        for subject_data in subjects:
-            subject = Subject(**subject_data)
-            stats = subject.get_approval_stats()
-            
-            report.append({
-                'id': subject.id,
-                'name': subject.name,
-                'teacher': subject.teacher,
-                'total_students': stats['total'],
+        return Reports.build_subject_report(Subject.get_stats())
+    
+    @staticmethod
+    def build_subject_report(subject_stats):
+        """Formata as estatísticas de Subject.get_stats como linhas do relatório"""
+        return [
+            {
+                'id': stats['id'],
+                'name': stats['name'],
+                'teacher': stats['teacher'],
+                'total_students': stats['total_students'],
                 'approved': stats['approved'],
+                'recovery': stats['recovery'],
                 'failed': stats['failed'],
-                'class_average': subject.get_class_average(),
+                'class_average': stats['class_average'],
                 'approval_rate': stats['approval_rate']
-            })
-        
-        return report
\ No newline at end of file
+            }
+            for stats in subject_stats
+        ]
\ No newline at end of file
@@ -0,0 +1,487 @@
+"""
+Backends de banco de dados usados por Database
+MySQL (padrão, mysql.connector) ou SQLite (arquivo local, em processo).
+O backend SQLite expõe a mesma interface de conexão/cursor de mysql.connector
+e traduz o dialeto MySQL usado pelos modelos, que continuam inalterados.
+"""
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+import mysql.connector
+from mysql.connector import errors
+
+MYSQL_TABLES = {
+    'students': """
+        CREATE TABLE IF NOT EXISTS students (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            name VARCHAR(100) NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            age INT NOT NULL CHECK (age BETWEEN 6 AND 18),
+            class VARCHAR(20) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """,
+    'subjects': """
+        CREATE TABLE IF NOT EXISTS subjects (
+            id VARCHAR(3) PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            teacher VARCHAR(100) NOT NULL,
+            hours_per_week INT NOT NULL,
+            min_grade DECIMAL(3,1) DEFAULT 6.0
+        )
+    """,
+    'grades': """
+        CREATE TABLE IF NOT EXISTS grades (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            student_id INT NOT NULL,
+            subject_id VARCHAR(3) NOT NULL,
+            period INT NOT NULL CHECK (period BETWEEN 1 AND 4),
+            grade DECIMAL(3,1) NOT NULL CHECK (grade BETWEEN 0 AND 10),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects(id) ON DELETE CASCADE,
+            UNIQUE KEY unique_grade (student_id, subject_id, period)
+        )
+    """,
+    'student_subject_stats': """
+        CREATE TABLE IF NOT EXISTS student_subject_stats (
+            student_id INT NOT NULL,
+            subject_id VARCHAR(3) NOT NULL,
+            grade_sum DECIMAL(6,1) NOT NULL DEFAULT 0,
+            grade_count INT NOT NULL DEFAULT 0,
+            average DECIMAL(7,4) NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'Sem Notas',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, subject_id),
+            FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects(id) ON DELETE CASCADE
+        )
+    """,
+    'data_versions': """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name VARCHAR(30) NOT NULL,
+            slot SMALLINT NOT NULL,
+            version BIGINT NOT NULL DEFAULT 0,
+            changed_at BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, slot)
+        )
+    """,
+    'schema_state': """
+        CREATE TABLE IF NOT EXISTS schema_state (
+            id TINYINT PRIMARY KEY,
+            fingerprint CHAR(64) NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """
+}
+
+# Versão de cada tabela (ETag/Last-Modified compartilhados por todos os processos),
+# avançada uma vez por transação por Database antes do commit. Cada transação
+# incrementa uma de VERSION_SLOTS linhas (sorteada): a versão é a soma delas, e
+# escritores concorrentes raramente disputam a mesma linha.
+VERSIONED_TABLES = ('students', 'subjects', 'grades')
+VERSION_SLOTS = 16
+
+# Tabelas cujas linhas somem junto (ON DELETE CASCADE) ao excluir de outra
+CASCADES = {'students': ('grades',), 'subjects': ('grades',)}
+
+_WRITE_TARGET = re.compile(
+    r'^\s*(?:(INSERT|REPLACE)(?:\s+IGNORE)?\s+INTO|(UPDATE)|(DELETE)\s+FROM|LOAD\s+DATA.*?INTO\s+TABLE)\s+(\w+)',
+    re.I | re.S
+)
+
+
+def written_tables(query):
+    """Tabelas versionadas alteradas por um comando de escrita (com as cascatas).
+    Comandos que não dá para identificar contam como escrita em todas."""
+    match = _WRITE_TARGET.match(query)
+    if not match:
+        return set(VERSIONED_TABLES)
+    table = match.group(4).lower()
+    tables = {table} if table in VERSIONED_TABLES else set()
+    if match.group(3):
+        tables.update(CASCADES.get(table, ()))
+    return tables
+
+
+# Notas e médias ficam em REAL (afinidade NUMERIC guardaria 16.0 como inteiro e
+# 17 / 2 viraria divisão inteira); o SQLiteCursor as devolve como Decimal, como o MySQL.
+SQLITE_TABLES = {
+    'students': """
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL COLLATE NOCASE,
+            email TEXT UNIQUE NOT NULL COLLATE NOCASE,
+            age INTEGER NOT NULL CHECK (age BETWEEN 6 AND 18),
+            class TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    'subjects': """
+        CREATE TABLE IF NOT EXISTS subjects (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL COLLATE NOCASE,
+            teacher TEXT NOT NULL,
+            hours_per_week INTEGER NOT NULL,
+            min_grade REAL DEFAULT 6.0
+        )
+    """,
+    'grades': """
+        CREATE TABLE IF NOT EXISTS grades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+            subject_id TEXT NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+            period INTEGER NOT NULL CHECK (period BETWEEN 1 AND 4),
+            grade REAL NOT NULL CHECK (grade BETWEEN 0 AND 10),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT unique_grade UNIQUE (student_id, subject_id, period)
+        )
+    """,
+    'student_subject_stats': """
+        CREATE TABLE IF NOT EXISTS student_subject_stats (
+            student_id INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+            subject_id TEXT NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+            grade_sum REAL NOT NULL DEFAULT 0,
+            grade_count INTEGER NOT NULL DEFAULT 0,
+            average REAL NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'Sem Notas',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, subject_id)
+        )
+    """,
+    'data_versions': """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT NOT NULL,
+            slot INTEGER NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            changed_at INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, slot)
+        )
+    """,
+    'schema_state': """
+        CREATE TABLE IF NOT EXISTS schema_state (
+            id INTEGER PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+}
+
+# Equivalente a ON UPDATE CURRENT_TIMESTAMP (só quando o UPDATE não definiu updated_at)
+SQLITE_TRIGGERS = [
+    f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_updated_at
+        AFTER UPDATE ON {table}
+        FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+        BEGIN
+            UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE {key};
+        END
+    """
+    for table, key in [
+        ('students', 'id = NEW.id'),
+        ('grades', 'id = NEW.id'),
+        ('student_subject_stats', 'student_id = NEW.student_id AND subject_id = NEW.subject_id')
+    ]
+]
+
+# WAL permite leituras concorrentes com uma escrita; synchronous=NORMAL é seguro com WAL
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -{cache_kb}",
+    "PRAGMA mmap_size = {mmap_bytes}",
+    "PRAGMA busy_timeout = {busy_timeout_ms}"
+]
+
+
+def _declared_columns(tables, kind):
+    """Colunas declaradas com o tipo informado em alguma das tabelas"""
+    return frozenset(re.findall(rf'^\s*(\w+) {kind}\b', '\n'.join(tables.values()), re.MULTILINE))
+
+
+def _decimal(value):
+    return Decimal(str(value)) if isinstance(value, (float, int)) else value
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+# Conversões feitas pelo SQLiteCursor nas colunas de resultado com esses nomes
+# (REAL -> Decimal, TIMESTAMP -> datetime, como o MySQL devolve). Ficam restritas
+# às conexões deste backend: nada é registrado globalmente no módulo sqlite3.
+SQLITE_CONVERTERS = {
+    **{column: _decimal for column in _declared_columns(SQLITE_TABLES, 'REAL')},
+    **{column: _timestamp for column in _declared_columns(SQLITE_TABLES, 'TIMESTAMP')}
+}
+
+
+class MySQLBackend:
+    """Servidor MySQL via mysql.connector"""
+
+    name = 'mysql'
+    supports_prepared = True
+    supports_replicas = True
+    tables = MYSQL_TABLES
+    extra_schema = []
+
+    def connect(self, connect_args):
+        return mysql.connector.connect(**connect_args)
+
+    def wait_timeout(self, raw):
+        """Tempo (s) após o qual o servidor derruba conexões ociosas"""
+        cursor = raw.cursor()
+        cursor.execute("SELECT @@wait_timeout")
+        wait_timeout = int(cursor.fetchone()[0])
+        cursor.close()
+        return wait_timeout
+
+    def open_schema(self, connect_args):
+        """Conecta sem especificar o database, criando-o se não existir"""
+        args = {key: connect_args[key] for key in ('host', 'port', 'user', 'password')}
+        connection = mysql.connector.connect(**args)
+        cursor = connection.cursor()
+        database = connect_args['database']
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        cursor.execute(f"USE {database}")
+        cursor.close()
+        return connection
+
+
+class SQLiteBackend:
+    """Arquivo SQLite local (modo WAL), sem servidor e sem rede"""
+
+    name = 'sqlite'
+    supports_prepared = False  # o sqlite3 já reaproveita statements (cached_statements)
+    supports_replicas = False
+    tables = SQLITE_TABLES
+    extra_schema = SQLITE_TRIGGERS
+
+    def __init__(self, path, statement_cache_size=128):
+        self.path = path
+        self.statement_cache_size = statement_cache_size
+        self.busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+        self.pragmas = [pragma.format(
+            cache_kb=int(os.getenv('SQLITE_CACHE_MB', 64)) * 1024,
+            mmap_bytes=int(os.getenv('SQLITE_MMAP_MB', 256)) * 1024 * 1024,
+            busy_timeout_ms=self.busy_timeout_ms
+        ) for pragma in SQLITE_PRAGMAS]
+
+    def connect(self, connect_args=None):
+        try:
+            raw = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout_ms / 1000,
+                isolation_level=None,  # transações controladas por SQLiteConnection
+                check_same_thread=False,  # o pool garante uma thread por vez
+                cached_statements=self.statement_cache_size
+            )
+            for pragma in self.pragmas:
+                raw.execute(pragma)
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        return SQLiteConnection(raw)
+
+    def wait_timeout(self, raw):
+        return None
+
+    def open_schema(self, connect_args=None):
+        return self.connect()
+
+
+def get_backend(name, database, statement_cache_size=128):
+    """Retorna o backend configurado (DB_BACKEND=mysql|sqlite)"""
+    if name == 'sqlite':
+        return SQLiteBackend(os.getenv('DB_PATH', f'{database}.db'), statement_cache_size or 128)
+    if name != 'mysql':
+        raise ValueError(f"Backend de banco desconhecido: {name}")
+    return MySQLBackend()
+
+
+# ---- Tradução do dialeto MySQL para SQLite ----
+
+_READ_ONLY = ('SELECT', 'WITH', 'EXPLAIN', 'PRAGMA')
+_ADD_INDEX = re.compile(r'^\s*ALTER TABLE (\w+) ADD INDEX (\w+) \(([^)]*)\)(?:\s*,\s*ALGORITHM=\w+)?(?:\s*,\s*LOCK=\w+)?\s*$', re.I)
+_DROP_INDEX = re.compile(r'^\s*ALTER TABLE \w+ DROP INDEX (\w+)(?:\s*,\s*ALGORITHM=\w+)?(?:\s*,\s*LOCK=\w+)?\s*$', re.I)
+_FOR_UPDATE = re.compile(r'\s+FOR UPDATE\s*$', re.I)
+
+
+@lru_cache(maxsize=512)
+def is_read_only(query):
+    """Indica se o comando só lê (SELECT, WITH, EXPLAIN, PRAGMA)"""
+    return query.lstrip().upper().startswith(_READ_ONLY)
+
+
+def translate(query):
+    """Converte uma consulta do dialeto MySQL para SQLite.
+    Retorna (sql, escreve); escreve indica se a consulta precisa da trava de escrita."""
+    match = _ADD_INDEX.match(query)
+    if match:
+        return f"CREATE INDEX IF NOT EXISTS {match.group(2)} ON {match.group(1)} ({match.group(3)})", True
+    match = _DROP_INDEX.match(query)
+    if match:
+        return f"DROP INDEX IF EXISTS {match.group(1)}", True
+
+    sql = query
+    writes = not is_read_only(sql)
+    if _FOR_UPDATE.search(sql):
+        # SQLite trava o banco inteiro: a transação começa já com a trava de escrita
+        sql = _FOR_UPDATE.sub('', sql)
+        writes = True
+
+    sql = re.sub(r'\bINSERT\s+IGNORE\b', 'INSERT OR IGNORE', sql, flags=re.I)
+    sql = re.sub(r'\bON DUPLICATE KEY UPDATE\b', 'ON CONFLICT DO UPDATE SET', sql, flags=re.I)
+    sql = re.sub(r'\bVALUES\((\w+)\)', r'excluded.\1', sql, flags=re.I)
+    sql = sql.replace('%s', '?')
+    return sql, writes
+
+
+def _translate_error(error):
+    """Converte exceções do sqlite3 nas de mysql.connector (tratadas pelos modelos)"""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        errno = 1062 if 'UNIQUE' in message else 1452 if 'FOREIGN KEY' in message else 3819
+        return errors.IntegrityError(msg=message, errno=errno)
+    if isinstance(error, sqlite3.OperationalError):
+        return errors.OperationalError(msg=message)
+    if isinstance(error, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+
+@contextmanager
+def _mysql_errors():
+    try:
+        yield
+    except sqlite3.Error as e:
+        raise _translate_error(e) from e
+
+
+def _params(params):
+    """Parâmetros para o sqlite3 (Decimal como float, sem adaptador global)"""
+    return tuple(float(value) if isinstance(value, Decimal) else value for value in params or ())
+
+
+class SQLiteConnection:
+    """Conexão sqlite3 com a interface de mysql.connector usada por Database.
+    Como no MySQL com autocommit desligado, escritas abrem uma transação que
+    dura até commit()/rollback(); leituras avulsas não travam o banco."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=None, prepared=None):
+        return SQLiteCursor(self, dictionary)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def begin(self, writes):
+        if writes and not self.raw.in_transaction:
+            self.raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        with _mysql_errors():
+            self.raw.commit()
+
+    def rollback(self):
+        with _mysql_errors():
+            self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        with _mysql_errors():
+            self.raw.execute("SELECT 1")
+
+    def get_server_info(self):
+        return f"SQLite {sqlite3.sqlite_version}"
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteCursor:
+    """Cursor sqlite3 com tradução de SQL, linhas como dict (dictionary=True),
+    tipos do MySQL (SQLITE_CONVERTERS; Decimal nos parâmetros vira float)
+    e erros de mysql.connector"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+        self._columns = None
+        self._converters = None
+
+    def execute(self, operation, params=None, multi=False):
+        sql, writes = translate(operation)
+        with _mysql_errors():
+            self._connection.begin(writes)
+            self._cursor.execute(sql, _params(params))
+        self._describe()
+
+    def executemany(self, operation, seq_params):
+        sql, writes = translate(operation)
+        with _mysql_errors():
+            self._connection.begin(writes)
+            self._cursor.executemany(sql, map(_params, seq_params))
+        self._describe()
+
+    def _describe(self):
+        description = self._cursor.description
+        if not description:
+            self._columns = self._converters = None
+            return
+        self._columns = [column[0] for column in description]
+        converters = [(index, SQLITE_CONVERTERS[name]) for index, name in enumerate(self._columns)
+                      if name in SQLITE_CONVERTERS]
+        self._converters = converters or None
+
+    def _row(self, row):
+        if row is None:
+            return row
+        if self._converters:
+            row = list(row)
+            for index, convert in self._converters:
+                row[index] = convert(row[index])
+            row = tuple(row)
+        if not self._dictionary:
+            return row
+        return dict(zip(self._columns, row))
+
+    def fetchone(self):
+        with _mysql_errors():
+            return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        with _mysql_errors():
+            return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        with _mysql_errors():
+            return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+
+class ResponseCache:
+    """Cache LRU em memória com TTL, invalidado por tabela (tag) nas escritas.
+    Com use_versions(), as versões das tabelas vêm do banco (tabela data_versions)
+    e valem para todos os processos e para escritas feitas fora da API."""
+
+    def __init__(self, ttl=None, max_entries=None, version_ttl=None):
+        self.ttl = ttl or int(os.getenv('CACHE_TTL', 300))
+        self.max_entries = max_entries or int(os.getenv('CACHE_MAX_ENTRIES', 128))
+        # Por quanto tempo (s) a versão lida do banco é reaproveitada (0 = a cada uso)
+        self.version_ttl = version_ttl if version_ttl is not None else float(os.getenv('DATA_VERSION_TTL', 1))
+        self._version_source = None
+        self._versions = None
+        self._versions_expire = 0
+
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._modified = {}
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._boot_time = datetime.now(timezone.utc).replace(microsecond=0)
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def use_versions(self, source):
+        """Passa a derivar gerações, ETag e Last-Modified de source() ->
+        {tabela: (versão, epoch da última escrita)}, lido no máximo a cada
+        version_ttl segundos. Se source falhar (None), usa os contadores do processo."""
+        self._version_source = source
+        self._versions = None
+
+    def _db_versions(self):
+        if self._version_source is None:
+            return None
+        now = time.monotonic()
+        if self._versions is None or now >= self._versions_expire:
+            try:
+                self._versions = self._version_source() or {}
+            except Exception as e:
+                print(f"Erro ao ler as versões das tabelas: {e}")
+                self._versions = {}
+            self._versions_expire = now + self.version_ttl
+        return self._versions or None
+
+    def generation(self, tags):
+        """Retorna o estado atual das tags (usado para descartar resultados obsoletos)"""
+        versions = self._db_versions()
+        with self._lock:
+            local = tuple(self._generations.get(tag, 0) for tag in tags)
+        if versions is None:
+            return local
+        return local + tuple(versions.get(tag, (0, 0)) for tag in tags)
+
+    def data_version(self, tags):
+        """Retorna (etag, last_modified) das tabelas informadas. Com as versões do
+        banco, o ETag é o mesmo em todos os processos; sem elas, vale só para este
+        processo (o identificador do processo evita colisões após reinícios)."""
+        versions = self._db_versions()
+        if versions is not None:
+            states = [versions.get(tag, (0, 0)) for tag in tags]
+            etag = '-'.join(f"{version}.{changed_at}" for version, changed_at in states)
+            changed_at = max([changed_at for _, changed_at in states] or [0])
+            return f"db-{etag}", datetime.fromtimestamp(changed_at, timezone.utc)
+
+        with self._lock:
+            generations = '.'.join(str(self._generations.get(tag, 0)) for tag in tags)
+            last_modified = max([self._modified.get(tag, self._boot_time) for tag in tags] or [self._boot_time])
+        return f"{self._boot_id}-{generations}", last_modified
+
+    def get(self, key):
+        """Retorna o valor armazenado ou None (contabilizando hit/miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            value, tags, expires_at, generation = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+        # Escrita de outro processo (ou fora da API) desde o cálculo do valor
+        if generation is not None and self._version_source is not None and generation != self.generation(tags):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                    self._stats['invalidations'] += 1
+                self._stats['misses'] += 1
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        return value
+
+    def set(self, key, value, tags, generation=None):
+        """Armazena um valor; ignora se alguma tag foi invalidada durante o cálculo"""
+        if generation is not None and generation != self.generation(tags):
+            return False
+
+        with self._lock:
+            self._entries[key] = (value, tuple(tags), time.monotonic() + self.ttl, generation)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+            return True
+
+    def invalidate(self, *tags):
+        """Remove as entradas que dependem de qualquer uma das tabelas informadas"""
+        with self._lock:
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                self._modified[tag] = now
+
+            stale = [key for key, (_, entry_tags, _, _) in self._entries.items()
+                     if any(tag in entry_tags for tag in tags)]
+            for key in stale:
+                del self._entries[key]
+
+            self._stats['invalidations'] += len(stale)
+            # A escrita já foi confirmada: a próxima leitura busca a versão nova no banco
+            self._versions = None
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Retorna contadores de uso do cache"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'db_versions': int(self._version_source is not None and bool(self._versions)),
+                'hit_rate': round(self._stats['hits'] / lookups * 100, 1) if lookups else 0,
+                **self._stats
+            }
+
+
+# Instância compartilhada entre rotas e modelos
+response_cache = ResponseCache()
+
+
+def invalidate(*tags):
+    """Invalida as respostas em cache e avança a versão das tabelas informadas"""
+    response_cache.invalidate(*tags)
@@ -0,0 +1,188 @@
+import os
+import threading
+from cache import response_cache
+from analytics import analytics
+from snapshots import snapshot_scheduler
+from startup import startup
+
+# Limites (em segundos) do histograma de duração das requisições
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Inclui o SQL (normalizado) do comando mais lento no Server-Timing; o cabeçalho
+# vai para qualquer cliente, então por padrão só saem tempos e contagens
+SERVER_TIMING_SQL = os.getenv('SERVER_TIMING_SQL', '0') != '0'
+
+
+class RouteStats:
+    """Totais acumulados de uma rota (método + regra de URL)"""
+
+    __slots__ = ('requests', 'errors', 'duration', 'buckets', 'queries', 'db_time', 'rows', 'max_queries', 'slowest_query')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.max_queries = 0
+        self.slowest_query = 0.0
+
+
+class RouteMetrics:
+    """Agrega, por rota, a duração das requisições e as estatísticas de SQL"""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method, route, status, duration, query_stats=None):
+        """Registra uma requisição concluída"""
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteStats()
+
+            stats.requests += 1
+            stats.duration += duration
+            if status >= 500:
+                stats.errors += 1
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.buckets[index] += 1
+
+            if query_stats is not None:
+                stats.queries += query_stats.count
+                stats.db_time += query_stats.time
+                stats.rows += query_stats.rows
+                stats.max_queries = max(stats.max_queries, query_stats.count)
+                stats.slowest_query = max(stats.slowest_query, query_stats.slowest_time)
+
+    def render(self, gauges=None):
+        """Retorna as métricas no formato texto do Prometheus (0.0.4).
+        gauges: {nome: (descrição, valor)} com valores instantâneos extras; o
+        valor pode ser uma lista de ({rótulo: valor}, valor) para séries rotuladas."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            snapshot = [(key, _copy(stats)) for key, stats in routes]
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(method, route, **extra):
+            return _labels({'method': method, 'route': route, **extra})
+
+        family('escola_http_requests_total', 'counter', 'Requisições atendidas por rota',
+               [f"escola_http_requests_total{labels(m, r)} {s.requests}" for (m, r), s in snapshot])
+        family('escola_http_errors_total', 'counter', 'Respostas 5xx por rota',
+               [f"escola_http_errors_total{labels(m, r)} {s.errors}" for (m, r), s in snapshot])
+
+        samples = []
+        for (m, r), s in snapshot:
+            for bound, count in zip(DURATION_BUCKETS, s.buckets):
+                samples.append(f"escola_http_request_duration_seconds_bucket{labels(m, r, le=bound)} {count}")
+            samples.append(f"escola_http_request_duration_seconds_bucket{labels(m, r, le='+Inf')} {s.requests}")
+            samples.append(f"escola_http_request_duration_seconds_sum{labels(m, r)} {s.duration:.6f}")
+            samples.append(f"escola_http_request_duration_seconds_count{labels(m, r)} {s.requests}")
+        family('escola_http_request_duration_seconds', 'histogram', 'Duração das requisições por rota', samples)
+
+        family('escola_db_queries_total', 'counter', 'Comandos SQL executados por rota',
+               [f"escola_db_queries_total{labels(m, r)} {s.queries}" for (m, r), s in snapshot])
+        family('escola_db_time_seconds_total', 'counter', 'Tempo gasto no banco por rota',
+               [f"escola_db_time_seconds_total{labels(m, r)} {s.db_time:.6f}" for (m, r), s in snapshot])
+        family('escola_db_rows_total', 'counter', 'Linhas lidas do banco por rota',
+               [f"escola_db_rows_total{labels(m, r)} {s.rows}" for (m, r), s in snapshot])
+        family('escola_db_queries_per_request_max', 'gauge', 'Maior número de comandos SQL em uma requisição',
+               [f"escola_db_queries_per_request_max{labels(m, r)} {s.max_queries}" for (m, r), s in snapshot])
+        family('escola_db_slowest_query_seconds', 'gauge', 'Comando SQL mais lento observado na rota',
+               [f"escola_db_slowest_query_seconds{labels(m, r)} {s.slowest_query:.6f}" for (m, r), s in snapshot])
+
+        for name, (help_text, value) in (gauges or {}).items():
+            series = value if isinstance(value, list) else [({}, value)]
+            family(name, 'gauge', help_text, [f"{name}{_labels(pairs)} {v}" for pairs, v in series])
+
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(stats):
+    copy = RouteStats()
+    for slot in RouteStats.__slots__:
+        value = getattr(stats, slot)
+        setattr(copy, slot, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def server_timing(duration, query_stats=None, normalize=None, include_sql=None):
+    """Monta o cabeçalho Server-Timing (tempos em milissegundos).
+    O texto do comando mais lento só entra com include_sql (padrão: SERVER_TIMING_SQL)."""
+    if include_sql is None:
+        include_sql = SERVER_TIMING_SQL
+    parts = []
+    if query_stats is not None and query_stats.count:
+        parts.append(f'db;dur={query_stats.time * 1000:.2f};desc="{query_stats.count} queries, {query_stats.rows} rows"')
+        slowest = f'db-slowest;dur={query_stats.slowest_time * 1000:.2f}'
+        if include_sql:
+            sql = query_stats.slowest_sql or ''
+            if normalize:
+                sql = normalize(sql)
+            sql = sql[:80].encode('ascii', 'ignore').decode().replace('\\', '').replace('"', "'")
+            slowest += f';desc="{sql}"'
+        parts.append(slowest)
+    parts.append(f'app;dur={duration * 1000:.2f}')
+    return ', '.join(parts)
+
+
+def process_gauges(db):
+    """Valores instantâneos do processo para /api/metrics (pool, prepared statements,
+    réplicas, cache, inicialização, snapshots e motor analítico), nos dois modos"""
+    gauges = {}
+    if db:
+        for key, value in db.pool_stats().items():
+            if isinstance(value, (int, float)):
+                gauges[f'escola_db_pool_{key}'] = (f'Pool de conexões: {key}', value)
+        for key, value in db.statement_stats().items():
+            gauges[f'escola_db_statements_{key}'] = (f'Prepared statements: {key}', value)
+        if db.replicas:
+            replicas = db.replica_stats()
+            gauges['escola_db_replica_healthy'] = ('Réplica no rodízio de leitura (1) ou fora (0)',
+                                                   [({'replica': r['name']}, int(r['healthy'])) for r in replicas])
+            gauges['escola_db_replica_lag_seconds'] = ('Atraso de replicação (-1 se desconhecido)',
+                                                       [({'replica': r['name']}, -1 if r['lag'] is None else r['lag']) for r in replicas])
+    for key, value in response_cache.stats().items():
+        gauges[f'escola_cache_{key}'] = (f'Cache de respostas: {key}', value)
+    startup_stats = startup.stats()
+    if startup_stats['duration_ms'] is not None:
+        gauges['escola_startup_duration_ms'] = ('Duração da inicialização do processo', startup_stats['duration_ms'])
+        gauges['escola_startup_phase_ms'] = ('Duração de cada fase da inicialização',
+                                             [({'phase': name}, ms) for name, ms in startup_stats['phases_ms'].items()])
+    snapshots = snapshot_scheduler.stats()
+    if snapshots:
+        gauges['escola_snapshot_age_seconds'] = ('Idade do snapshot pré-calculado (-1 se ainda não gerado)',
+                                                 [({'report': name}, -1 if s['age'] is None else s['age']) for name, s in snapshots.items()])
+        gauges['escola_snapshot_generation'] = ('Geração do snapshot pré-calculado',
+                                                [({'report': name}, s['generation']) for name, s in snapshots.items()])
+        gauges['escola_snapshot_duration_ms'] = ('Tempo do último recálculo do snapshot',
+                                                 [({'report': name}, s['duration_ms'] or 0) for name, s in snapshots.items()])
+    for key, value in analytics.stats().items():
+        if isinstance(value, (int, float)):
+            gauges[f'escola_analytics_{key}'] = (f'Motor analítico: {key}', int(value) if isinstance(value, bool) else value)
+    return gauges
+
+
+# Instância compartilhada pelas rotas
+route_metrics = RouteMetrics()
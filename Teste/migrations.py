@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Migrações versionadas do schema (tabela schema_version)
+As tabelas base continuam em Database.create_database; aqui ficam as
+alterações posteriores, aplicadas em ordem e registradas por versão.
+
+Exemplos:
+    python migrations.py status
+    python migrations.py upgrade          # até a última versão
+    python migrations.py downgrade 2      # desfaz as versões acima de 2
+"""
+
+import sys
+import time
+from mysql.connector import Error, errorcode
+
+# Índices criados sem bloquear escritas (DDL online do InnoDB)
+ONLINE = "ALGORITHM=INPLACE, LOCK=NONE"
+
+
+def add_index(table, name, columns):
+    return f"ALTER TABLE {table} ADD INDEX {name} ({columns}), {ONLINE}"
+
+
+def drop_index(table, name):
+    return f"ALTER TABLE {table} DROP INDEX {name}, {ONLINE}"
+
+
+# (versão, descrição, comandos de subida, comandos de descida)
+MIGRATIONS = [
+    (
+        1,
+        'Índice de cobertura grades(subject_id, student_id, grade) para agregados por matéria',
+        [add_index('grades', 'idx_grades_subject_student_grade', 'subject_id, student_id, grade')],
+        [drop_index('grades', 'idx_grades_subject_student_grade')]
+    ),
+    (
+        2,
+        'Índice students(name) para listagens ordenadas por nome',
+        [add_index('students', 'idx_students_name', 'name')],
+        [drop_index('students', 'idx_students_name')]
+    ),
+    (
+        3,
+        'Índice students(class) para filtros por turma',
+        [add_index('students', 'idx_students_class', 'class')],
+        [drop_index('students', 'idx_students_class')]
+    ),
+    (
+        4,
+        'Índice de cobertura student_subject_stats(subject_id, grade_count, average, status)',
+        [add_index('student_subject_stats', 'idx_stats_subject_average', 'subject_id, grade_count, average, status')],
+        [drop_index('student_subject_stats', 'idx_stats_subject_average')]
+    )
+]
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(200) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        execution_ms INT NOT NULL DEFAULT 0
+    )
+"""
+
+# Comandos que podem ter sido concluídos antes de uma falha (reexecução segura)
+ALREADY_APPLIED = {errorcode.ER_DUP_KEYNAME, errorcode.ER_CANT_DROP_FIELD_OR_KEY}
+
+LOCK_NAME = 'escola_escudo.migrations'
+
+
+class MigrationRunner:
+    """Aplica/desfaz as migrações em ordem, uma versão por vez"""
+
+    def __init__(self, connection, migrations=None, lock_timeout=60, dialect='mysql'):
+        self.connection = connection
+        self.dialect = dialect
+        self.migrations = sorted(migrations or MIGRATIONS)
+        self.lock_timeout = lock_timeout
+
+    def _ensure_table(self, cursor):
+        cursor.execute(SCHEMA_VERSION_TABLE)
+
+    def applied_versions(self):
+        """Retorna o conjunto de versões já aplicadas"""
+        cursor = self.connection.cursor()
+        try:
+            self._ensure_table(cursor)
+            cursor.execute("SELECT version FROM schema_version")
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def current_version(self):
+        return max(self.applied_versions(), default=0)
+
+    def status(self):
+        """Lista (versão, descrição, aplicada) de todas as migrações conhecidas"""
+        applied = self.applied_versions()
+        return [(version, description, version in applied) for version, description, _, _ in self.migrations]
+
+    def _run(self, cursor, statements):
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Error as e:
+                if e.errno not in ALREADY_APPLIED:
+                    raise
+
+    def _locked(self, action):
+        """Executa a ação com um lock nomeado, para que só um processo migre por vez"""
+        cursor = self.connection.cursor()
+        try:
+            self._ensure_table(cursor)
+            if self.dialect != 'mysql':
+                # SQLite: um único processo/arquivo, e a escrita já é serializada
+                return action(cursor)
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, self.lock_timeout))
+            if cursor.fetchone()[0] != 1:
+                raise Error(msg="Tempo esgotado aguardando o lock de migração")
+            try:
+                return action(cursor)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def upgrade(self, target=None):
+        """Aplica as migrações pendentes até target (padrão: a última).
+        Retorna as versões aplicadas."""
+        def action(cursor):
+            cursor.execute("SELECT version FROM schema_version")
+            applied = {row[0] for row in cursor.fetchall()}
+            done = []
+            for version, description, up, _ in self.migrations:
+                if version in applied or (target is not None and version > target):
+                    continue
+                started = time.perf_counter()
+                self._run(cursor, up)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description, execution_ms) VALUES (%s, %s, %s)",
+                    (version, description, int((time.perf_counter() - started) * 1000))
+                )
+                self.connection.commit()
+                print(f"Migração {version} aplicada: {description}")
+                done.append(version)
+            return done
+        return self._locked(action)
+
+    def downgrade(self, target):
+        """Desfaz, da mais nova para a mais antiga, as migrações acima de target.
+        Retorna as versões desfeitas."""
+        def action(cursor):
+            cursor.execute("SELECT version FROM schema_version")
+            applied = {row[0] for row in cursor.fetchall()}
+            done = []
+            for version, description, _, down in reversed(self.migrations):
+                if version not in applied or version <= target:
+                    continue
+                self._run(cursor, down)
+                cursor.execute("DELETE FROM schema_version WHERE version = %s", (version,))
+                self.connection.commit()
+                print(f"Migração {version} desfeita: {description}")
+                done.append(version)
+            return done
+        return self._locked(action)
+
+
+def main(argv):
+    from database import Database
+
+    command = argv[0] if argv else 'status'
+    db = Database()
+    try:
+        connection = db.open_connection()
+    except Error as e:
+        print(f"Erro ao conectar com MySQL: {e}")
+        return False
+
+    try:
+        runner = MigrationRunner(connection, dialect=db.backend.name)
+        if command == 'upgrade':
+            applied = runner.upgrade(int(argv[1]) if len(argv) > 1 else None)
+            print(f"{len(applied)} migração(ões) aplicada(s); versão atual: {runner.current_version()}")
+        elif command == 'downgrade' and len(argv) > 1:
+            reverted = runner.downgrade(int(argv[1]))
+            print(f"{len(reverted)} migração(ões) desfeita(s); versão atual: {runner.current_version()}")
+        elif command == 'status':
+            for version, description, applied in runner.status():
+                print(f"[{'x' if applied else ' '}] {version:04d} {description}")
+        else:
+            print(__doc__)
+            return False
+        return True
+
+    except Error as e:
+        print(f"Erro ao migrar: {e}")
+        return False
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:]) else 1)
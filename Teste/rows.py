@@ -0,0 +1,150 @@
+"""
+Linhas tipadas das listagens (alunos, matérias e notas) e o encoder JSON delas
+Cada linha é uma tupla (__slots__ vazio, sem dict por linha) com as colunas da
+consulta na ordem do SELECT. O encoder monta o JSON coluna a coluna pelo tipo
+declarado, sem passar pelo json.JSONEncoder: DECIMAL(3,1) vira número direto
+(str(Decimal('7.5')) == '7.5'), datas seguem o formato HTTP do Flask.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from json.encoder import encode_basestring
+from keyword import iskeyword
+from operator import itemgetter
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+
+class Row(tuple):
+    """Linha imutável de uma consulta; aceita row['coluna'] e row.get('coluna')
+    como os dicts do cursor (dictionary=True) que ela substitui"""
+
+    __slots__ = ()
+    columns = ()
+    types = ()
+    _index = {}
+
+    def __new__(cls, values):
+        return tuple.__new__(cls, values)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = self._index[key]
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self.columns
+
+    def to_dict(self):
+        return dict(zip(self.columns, self))
+
+    @classmethod
+    def check(cls, description):
+        """Confere as colunas do cursor com as da linha (mesma ordem)"""
+        names = tuple(column[0] for column in description or ())
+        if names != cls.columns:
+            raise ValueError(f"{cls.__name__} espera as colunas {cls.columns}, a consulta retornou {names}")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def row_type(name, fields):
+    """Cria uma classe de linha a partir de [(coluna, tipo)]; colunas que são
+    identificadores válidos também viram atributos (row.name)"""
+    columns = tuple(column for column, _ in fields)
+    namespace = {
+        '__slots__': (),
+        'columns': columns,
+        'types': tuple(kind for _, kind in fields),
+        '_index': {column: index for index, column in enumerate(columns)},
+        '_encoders': tuple((encode_basestring(column) + ':', ENCODERS[kind]) for column, kind in fields)
+    }
+    for index, column in enumerate(columns):
+        if column.isidentifier() and not iskeyword(column):
+            namespace[column] = property(itemgetter(index))
+    return type(name, (Row,), namespace)
+
+
+# ---- Encoder ----
+
+def _number(value):
+    # int, float (SQLite) e Decimal: str() já é um número JSON válido
+    return 'null' if value is None else str(value)
+
+
+def _string(value):
+    return 'null' if value is None else encode_basestring(value)
+
+
+@lru_cache(maxsize=4096)
+def _http_date(value):
+    # Timestamps se repetem muito nas listagens (cargas em lote)
+    return '"' + http_date(value) + '"'
+
+
+def _datetime(value):
+    return 'null' if value is None else _http_date(value)
+
+
+ENCODERS = {int: _number, Decimal: _number, str: _string, datetime: _datetime}
+
+
+def encode_row(row):
+    """Serializa uma linha como objeto JSON (chaves na ordem das colunas)"""
+    return '{' + ','.join([key + encode(value) for (key, encode), value in zip(row._encoders, row)]) + '}'
+
+
+def encode_rows(rows):
+    """Serializa uma lista de linhas como array JSON"""
+    return '[' + ','.join(map(encode_row, rows)) + ']'
+
+
+def json_default(o):
+    """Decimal como número JSON (o padrão do Flask o converte em string)"""
+    if isinstance(o, Decimal):
+        return float(o)
+    return DefaultJSONProvider.default(o)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """JSON do app: linhas tipadas pelo encoder acima, Decimal como número
+    e UTF-8 sem escapes. Sem indentação, a não ser em debug."""
+
+    ensure_ascii = False
+    default = staticmethod(json_default)
+
+    def dumps(self, obj, **kwargs):
+        if isinstance(obj, Row):
+            return encode_row(obj)
+        if isinstance(obj, list) and obj and isinstance(obj[0], Row):
+            return encode_rows(obj)
+        return super().dumps(obj, **kwargs)
+
+
+# ---- Formatos das listagens ----
+
+# SELECT id, name, email, age, class, created_at, updated_at FROM students
+StudentRow = row_type('StudentRow', [
+    ('id', int), ('name', str), ('email', str), ('age', int), ('class', str),
+    ('created_at', datetime), ('updated_at', datetime)
+])
+
+# SELECT id, name, teacher, hours_per_week, min_grade FROM subjects
+SubjectRow = row_type('SubjectRow', [
+    ('id', str), ('name', str), ('teacher', str), ('hours_per_week', int), ('min_grade', Decimal)
+])
+
+# SELECT g.id, ..., s.name as student_name, sub.name as subject_name FROM grades g JOIN ...
+GradeRow = row_type('GradeRow', [
+    ('id', int), ('student_id', int), ('subject_id', str), ('period', int), ('grade', Decimal),
+    ('created_at', datetime), ('updated_at', datetime), ('student_name', str), ('subject_name', str)
+])
+
+STUDENT_COLUMNS = ", ".join(StudentRow.columns)
+SUBJECT_COLUMNS = ", ".join(SubjectRow.columns)
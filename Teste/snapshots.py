@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from cache import response_cache
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+
+class Snapshot:
+    """Resultado pré-calculado de uma rota, já serializado em JSON (imutável)"""
+
+    __slots__ = ('body', 'generation', 'generated_at', 'duration')
+
+    def __init__(self, body, generation, generated_at, duration):
+        self.body = body
+        self.generation = generation
+        self.generated_at = generated_at
+        self.duration = duration
+
+
+class SnapshotJob:
+    """Estado de um relatório agendado"""
+
+    def __init__(self, name, compute, tags):
+        self.name = name
+        self.compute = compute
+        self.tags = tuple(tags)
+        self.snapshot = None
+        self.computed_at = None
+        self.seen = None
+        self.changed_at = None
+        self.dirty_since = None
+        self.errors = 0
+        self.last_error = None
+
+
+class SnapshotScheduler:
+    """Recalcula dashboard e relatórios em segundo plano, a cada `interval`
+    segundos e logo após rajadas de escrita (tags do cache de respostas
+    invalidadas e depois `debounce` segundos sem novas escritas, ou no máximo
+    `max_delay` segundos após a primeira). As rotas servem sempre o último
+    snapshot completo, sem esperar pelo recálculo."""
+
+    def __init__(self, interval=None, debounce=None, max_delay=None):
+        self.interval = interval if interval is not None else float(os.getenv('SNAPSHOT_INTERVAL', 60))
+        self.debounce = debounce if debounce is not None else float(os.getenv('SNAPSHOT_DEBOUNCE', 1))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv('SNAPSHOT_MAX_DELAY', 10))
+        self.enabled = self.interval > 0
+
+        self.app = None
+        self.render = None
+        self._jobs = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, name, compute, tags):
+        """Agenda compute() (sem argumentos, retorno serializável em JSON)"""
+        self._jobs[name] = SnapshotJob(name, compute, tags)
+
+    def start(self, app, render=None):
+        """Inicia a thread de recálculo (idempotente; chamada a cada requisição
+        para que cada processo do servidor tenha a sua). render(valor) -> bytes
+        serializa o resultado; o padrão usa o JSON do app Flask, no app context."""
+        if not self.enabled or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.app = app
+            self.render = render or self._render_flask
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='snapshot-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get(self, name):
+        """Último snapshot da rota, ou None se ainda não houver um"""
+        job = self._jobs.get(name)
+        return job.snapshot if job is not None else None
+
+    def refresh(self, name=None):
+        """Pede o recálculo imediato (de uma rota ou de todas), sem esperar"""
+        for job in self._jobs.values():
+            if name is None or job.name == name:
+                job.dirty_since = job.changed_at = 0
+        self._wake.set()
+
+    def _due(self, job, now):
+        generation = response_cache.generation(job.tags)
+        if generation != job.seen:
+            job.seen = generation
+            job.changed_at = now
+            if job.dirty_since is None:
+                job.dirty_since = now
+
+        if job.computed_at is None:
+            return True
+        if job.dirty_since is not None:
+            # Rajada de escritas: espera a pausa, mas não além de max_delay
+            return now - job.changed_at >= self.debounce or now - job.dirty_since >= self.max_delay
+        return now - job.computed_at >= self.interval
+
+    def _run(self):
+        tick = max(min(self.debounce, 1.0), 0.05)
+        while not self._stop.is_set():
+            for job in list(self._jobs.values()):
+                if self._stop.is_set():
+                    break
+                if self._due(job, time.monotonic()):
+                    self._compute(job)
+            self._wake.wait(tick)
+            self._wake.clear()
+
+    def _compute(self, job):
+        # Versão das tags antes do cálculo: escritas durante o cálculo geram novo ciclo
+        job.seen = response_cache.generation(job.tags)
+        job.dirty_since = None
+        started = time.perf_counter()
+        try:
+            body = self.render(job.compute())
+        except Exception as e:
+            job.errors += 1
+            job.last_error = str(e)
+            # Mantém o snapshot anterior e tenta de novo no próximo intervalo
+            job.computed_at = time.monotonic()
+            print(f"Erro ao recalcular snapshot {job.name}: {e}")
+            return
+
+        previous = job.snapshot
+        job.snapshot = Snapshot(
+            body,
+            previous.generation + 1 if previous else 1,
+            datetime.now(timezone.utc),
+            time.perf_counter() - started
+        )
+        job.computed_at = time.monotonic()
+        job.last_error = None
+
+    def _render_flask(self, value):
+        with self.app.app_context():
+            return self.app.json.response(value).get_data()
+
+    def stats(self):
+        """Estado dos snapshots para /api/health e /api/metrics"""
+        now = datetime.now(timezone.utc)
+        return {
+            job.name: {
+                'generation': job.snapshot.generation if job.snapshot else 0,
+                'generated_at': job.snapshot.generated_at.isoformat() if job.snapshot else None,
+                'age': round((now - job.snapshot.generated_at).total_seconds(), 1) if job.snapshot else None,
+                'duration_ms': round(job.snapshot.duration * 1000, 1) if job.snapshot else None,
+                'bytes': len(job.snapshot.body) if job.snapshot else 0,
+                'pending': job.dirty_since is not None,
+                'errors': job.errors,
+                'last_error': job.last_error
+            }
+            for job in self._jobs.values()
+        }
+
+
+# Instância compartilhada pelas rotas
+snapshot_scheduler = SnapshotScheduler()
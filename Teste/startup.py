@@ -0,0 +1,99 @@
+"""
+Inicialização explícita do processo, antes de aceitar requisições
+Substitui o @app.before_first_request (removido no Flask 2.3), que fazia a
+primeira requisição após cada deploy/reinício pagar o DDL completo. Aqui o
+DDL só roda se o fingerprint do schema gravado no banco mudou; em seguida o
+pool é aquecido e o catálogo de matérias carregado em memória.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from database import Database, get_database
+from cache import response_cache
+from av1.models import subject_catalog
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+
+class Startup:
+    """Fases da inicialização (schema, pool, matérias), cronometradas.
+    Uma falha não impede o processo de subir: fica registrada em stats()."""
+
+    def __init__(self, warm_connections=None):
+        if warm_connections is None and os.getenv('DB_POOL_WARM'):
+            warm_connections = int(os.getenv('DB_POOL_WARM'))
+        self.warm_connections = warm_connections  # None = tamanho do pool
+        self.schema = None
+        self.connections = 0
+        self.phases = {}
+        self.errors = {}
+        self.duration = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.errors[name] = str(e)
+            print(f"Erro na inicialização ({name}): {e}")
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def run(self):
+        """Executa as fases uma vez por processo (chamadas seguintes não fazem nada)"""
+        with self._lock:
+            if self.finished_at is not None:
+                return self.stats()
+            started = time.perf_counter()
+
+            db = None
+            with self._phase('schema'):
+                db = get_database()
+                if db is None:
+                    # MySQL sem o database ainda (ou fora do ar): create_database o cria
+                    self.schema = 'applied' if Database().create_database() else 'failed'
+                    db = get_database()
+                else:
+                    self.schema = db.ensure_schema()
+
+            if db is not None:
+                # ETag/Last-Modified e gerações pela tabela data_versions (todos os processos)
+                response_cache.use_versions(db.data_versions)
+                if self.warm_connections != 0:
+                    with self._phase('pool'):
+                        self.connections = db.warm_pool(self.warm_connections)
+                with self._phase('subjects'):
+                    if subject_catalog.load(db) is None:
+                        raise RuntimeError('não foi possível ler as matérias')
+            else:
+                self.errors['database'] = 'banco de dados indisponível'
+
+            self.duration = time.perf_counter() - started
+            self.finished_at = datetime.now(timezone.utc)
+            phases = ', '.join(f"{name} {ms} ms" for name, ms in self.phases.items())
+            print(f"Inicialização em {self.duration * 1000:.0f} ms (schema: {self.schema}; {phases})")
+            return self.stats()
+
+    def stats(self):
+        """Resultado da inicialização para /api/health e /api/metrics"""
+        return {
+            'schema': self.schema,
+            'duration_ms': round(self.duration * 1000, 1) if self.duration is not None else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'phases_ms': dict(self.phases),
+            'connections_opened': self.connections,
+            'subjects': subject_catalog.stats()['subjects'],
+            'errors': dict(self.errors)
+        }
+
+
+# Instância do processo (executada por av1.app.py e asgi_app.py)
+startup = Startup()
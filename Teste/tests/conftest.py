@@ -0,0 +1,78 @@
+"""
+Fixtures dos testes: app Flask sobre um arquivo SQLite temporário
+Sem MySQL: DB_BACKEND=sqlite, com os mesmos modelos e rotas de av1.app.py.
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS = os.path.join(ROOT, 'av1', 'av1', 'av1.models.py')
+
+# Configuração lida na importação dos módulos (instâncias compartilhadas)
+os.environ['DB_BACKEND'] = 'sqlite'
+# Processos filhos (run_outside) usam o mesmo arquivo do processo dos testes
+os.environ['DB_PATH'] = os.environ.get('ESCOLA_TESTS_DB') or os.path.join(tempfile.mkdtemp(prefix='escola-tests-'), 'escola.db')
+os.environ['ESCOLA_TESTS_DB'] = os.environ['DB_PATH']
+os.environ['ANALYTICS_ENGINE'] = '1'
+os.environ['SNAPSHOT_INTERVAL'] = '0'
+os.environ['REPORT_WORKERS'] = '1'
+os.environ['DATA_VERSION_TTL'] = '0'
+sys.path.insert(0, ROOT)
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_models():
+    import av1
+    # av1/models.py é só um marcador: os modelos ficam em av1/av1/av1.models.py
+    if not hasattr(importlib.import_module('av1.models'), 'Student'):
+        av1.models = _load('av1.models', MODELS)
+    return av1.models
+
+
+@pytest.fixture(scope='session')
+def app():
+    load_models()
+    return _load('escola_app', os.path.join(ROOT, 'av1.app.py')).app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def run_outside():
+    """Executa código com os modelos carregados em outro processo (como outro
+    worker ou um script): run_outside("Grade(...).save()")"""
+    def run(code):
+        subprocess.run([sys.executable, os.path.join(ROOT, 'tests', 'outside.py'), code], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+    return run
+
+
+@pytest.fixture
+def both():
+    """Resultado de fn() pelas consultas SQL e pelo motor analítico: both(fn)"""
+    from analytics import analytics
+
+    def run(fn):
+        analytics.enabled = False
+        try:
+            expected = fn()
+        finally:
+            analytics.enabled = True
+        return expected, fn()
+    return run
@@ -0,0 +1,10 @@
+"""
+Executa, em um processo separado, o código recebido com os modelos carregados
+(usado pelo fixture run_outside de conftest.py)
+"""
+
+import sys
+
+from conftest import load_models
+
+exec(sys.argv[1], dict(vars(load_models())))
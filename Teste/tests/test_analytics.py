@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def test_analytics_follows_writes_outside_the_process(client, run_outside, both):
+    from av1.models import Dashboard, Reports
+
+    before = client.get('/api/dashboard').get_json()
+
+    # Aluno e nota gravados por outro processo (outro worker, script)
+    run_outside(
+        "student = Student(name='Outro Processo', email='outro.processo@email.com', age=13, student_class='7º Ano B')\n"
+        "student.save(strict=True)\n"
+        "Grade(student_id=student.id, subject_id='MAT', period=1, grade=3.0).save()"
+    )
+
+    dashboard = client.get('/api/dashboard').get_json()
+    assert dashboard['total_students'] == before['total_students'] + 1
+
+    for report in (Dashboard.get_stats, Reports.get_general_stats, Reports.get_class_report,
+                   Reports.get_student_report, Reports.get_subject_report):
+        expected, actual = both(report)
+        assert actual == expected, report.__qualname__
@@ -0,0 +1,60 @@
+def test_etag_follows_writes_outside_the_process(client, run_outside):
+    first = client.get('/api/students')
+    etag = first.headers['ETag']
+    assert client.get('/api/students', headers={'If-None-Match': etag}).status_code == 304
+
+    # Escrita sem passar pela API deste processo (outro worker ou script)
+    run_outside("get_database().execute_query('UPDATE students SET age = age + 1 WHERE id = 1')")
+
+    response = client.get('/api/students', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_is_shared_between_processes(client):
+    from cache import ResponseCache
+    from database import get_database
+
+    # Outro processo: contadores locais zerados, mesma versão no banco
+    other = ResponseCache()
+    other.use_versions(get_database().data_versions)
+    etag, _ = other.data_version(('students',))
+    assert client.get('/api/students', headers={'If-None-Match': f'W/"{etag}"'}).status_code == 304
+
+
+def test_versions_are_bumped_once_per_transaction(app):
+    from database import get_database
+
+    db = get_database()
+    before = db.data_versions()
+    # Sem alterar os dados: as outras tabelas (resumo, motor analítico) seguem coerentes
+    with db.cursor() as cursor:
+        for student_id in (1, 2, 3):
+            cursor.execute("UPDATE students SET age = age WHERE id = %s", (student_id,))
+    after = db.data_versions()
+    assert after['students'][0] == before['students'][0] + 1
+    assert after['grades'] == before['grades']
+
+    # Leituras não avançam versões
+    with db.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM grades")
+        cursor.fetchall()
+    assert db.data_versions() == after
+
+
+def test_student_subject_grades_follow_subject_changes(client):
+    from database import get_database
+
+    url = '/api/grades/student/2/subject/ING'
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    # A nota mínima da matéria muda o status devolvido pela rota
+    db = get_database()
+    db.execute_query("UPDATE subjects SET min_grade = min_grade + 1 WHERE id = 'ING'")
+    try:
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    finally:
+        db.execute_query("UPDATE subjects SET min_grade = min_grade - 1 WHERE id = 'ING'")
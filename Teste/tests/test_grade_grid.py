@@ -0,0 +1,112 @@
+"""
+Planilha de notas (POST /api/grades/grid): classificação das células,
+resumo aluno × matéria, motor analítico e rollback
+"""
+
+import mysql.connector
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def _grid(client, cells, subject_id='GEO', period=None):
+    response = client.post('/api/grades/grid', json={'subject_id': subject_id, 'period': period, 'grades': cells})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _stored(client, student_id, subject_id='GEO'):
+    grades = client.get(f'/api/grades?student_id={student_id}&subject_id={subject_id}').get_json()
+    return {row['period']: float(row['grade']) for row in grades}
+
+
+def _summary_matches_grades(subject_id):
+    from database import get_database, GRADE_SUMMARY_SELECT
+
+    db = get_database()
+    columns = "student_id, subject_id, grade_sum, grade_count, average, status"
+    summary = db.fetch_query(f"SELECT {columns} FROM student_subject_stats WHERE subject_id = %s "
+                             "ORDER BY student_id", (subject_id,))
+    expected = db.fetch_query(f"SELECT {columns} FROM ({GRADE_SUMMARY_SELECT}) r WHERE subject_id = %s "
+                              "ORDER BY student_id", (subject_id,))
+    return [dict(row) for row in summary] == [dict(row) for row in expected]
+
+
+def test_grid_splits_created_updated_unchanged_and_invalid(client):
+    first = _grid(client, [{'student_id': 4, 'grade': 7.0}, {'student_id': 4, 'period': 2, 'grade': 8.0}], period=1)
+    assert first['summary'] == {'created': 2}
+    assert _stored(client, 4) == {1: 7.0, 2: 8.0}
+
+    result = _grid(client, [
+        {'student_id': 4, 'period': 1, 'grade': 7.0},      # igual ao gravado
+        {'student_id': 4, 'period': 2, 'grade': 5.5},      # alterada
+        {'student_id': 5, 'period': 1, 'grade': 9.0},      # nova
+        {'period': 1, 'grade': 5.0},                       # sem aluno
+        {'student_id': 5, 'period': 5, 'grade': 5.0},      # bimestre fora do intervalo
+        {'student_id': 5, 'period': 2, 'grade': 11},       # nota fora do intervalo
+        {'student_id': 5, 'period': 1, 'grade': 6.0},      # célula repetida
+        {'student_id': 9999, 'period': 1, 'grade': 6.0}    # aluno inexistente
+    ])
+
+    assert [cell['status'] for cell in result['cells']] == [
+        'unchanged', 'updated', 'created', 'invalid', 'invalid', 'invalid', 'invalid', 'invalid'
+    ]
+    assert result['summary'] == {'unchanged': 1, 'updated': 1, 'created': 1, 'invalid': 5}
+    assert result['cells'][6]['message'] == 'Célula duplicada na planilha'
+    assert result['cells'][7]['message'] == 'Estudante não encontrado'
+    assert _stored(client, 4) == {1: 7.0, 2: 5.5}
+    assert _stored(client, 5) == {1: 9.0}
+
+    unknown = _grid(client, [{'student_id': 4, 'period': 1, 'grade': 6.0}], subject_id='XXX')
+    assert unknown['cells'][0]['message'] == 'Matéria não encontrada'
+
+
+def test_grid_updates_summary_and_analytics_incrementally(client, both):
+    from analytics import analytics
+    from av1.models import Dashboard, Reports
+
+    client.get('/api/dashboard')
+    loads = analytics.stats()['loads']
+
+    result = _grid(client, [
+        {'student_id': 3, 'period': 1, 'grade': 4.5},
+        {'student_id': 3, 'period': 2, 'grade': 6.5},
+        {'student_id': 1, 'period': 1, 'grade': 9.5}
+    ], subject_id='HIS')
+    assert result['summary'] == {'created': 2, 'updated': 1}
+
+    assert _summary_matches_grades('HIS')
+    scorecard = client.get('/api/grades/student/3/subject/HIS').get_json()
+    assert scorecard['average'] == 5.5 and scorecard['status'] == 'Recuperação'
+
+    # Variações aplicadas ao motor, sem recarga, com o mesmo resultado das consultas SQL
+    for report in (Dashboard.get_stats, Reports.get_general_stats, Reports.get_student_report,
+                   Reports.get_subject_report):
+        expected, actual = both(report)
+        assert actual == expected, report.__qualname__
+    assert analytics.stats()['loads'] == loads
+
+
+def test_grid_rolls_back_when_the_transaction_fails(client, monkeypatch):
+    from analytics import analytics
+    from av1.models import Grade
+    from database import get_database
+
+    before = _stored(client, 2, 'CIE')
+    versions = get_database().data_versions()
+    increments = analytics.stats()['increments']
+
+    def fail(cursor, subject_id, student_ids):
+        raise mysql.connector.Error('falha simulada')
+    monkeypatch.setattr(Grade, 'refresh_summary', staticmethod(fail))
+
+    result = _grid(client, [
+        {'student_id': 2, 'period': 1, 'grade': 3.0},
+        {'student_id': 2, 'period': 9, 'grade': 3.0}
+    ], subject_id='CIE')
+
+    assert [cell['status'] for cell in result['cells']] == ['error', 'invalid']
+    assert _stored(client, 2, 'CIE') == before
+    assert _summary_matches_grades('CIE')
+    assert get_database().data_versions()['grades'] == versions['grades']
+    assert analytics.stats()['increments'] == increments
@@ -0,0 +1,56 @@
+"""
+Importação em massa de estudantes (POST /api/students/import, resposta em NDJSON)
+"""
+
+import json
+
+
+def _import(client, body, mimetype, chunk_size=2):
+    response = client.post(f'/api/students/import?chunk_size={chunk_size}', data=body.encode('utf-8'),
+                           content_type=mimetype)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_import_csv_reports_rejected_lines_and_summary(client):
+    total = len(client.get('/api/students').get_json())
+    body = (
+        "name,email,age,class\n"
+        "Importado Um,importado.um@email.com,11,6º Ano A\n"
+        "Importado Dois,importado.dois@email.com,12,6º Ano A\n"
+        "Importado Três,joao@email.com,12,6º Ano A\n"           # já cadastrado
+        "Importado Quatro,importado.um@email.com,13,7º Ano A\n"  # repetido no arquivo (outro lote)
+        "Importado Cinco,importado.cinco@email.com,30,7º Ano A\n"
+        "Importado Seis,importado.seis@email.com,14,8º Ano A\n"
+    )
+    *rejected, summary = _import(client, body, 'text/csv')
+
+    assert summary == {'status': 'done', 'inserted': 3, 'duplicate': 2, 'invalid': 1, 'error': 0}
+    assert {(line['line'], line['status']) for line in rejected} == {(4, 'duplicate'), (5, 'duplicate'), (6, 'invalid')}
+
+    students = client.get('/api/students').get_json()
+    assert len(students) == total + 3
+    emails = {student['email'] for student in students}
+    assert {'importado.um@email.com', 'importado.dois@email.com', 'importado.seis@email.com'} <= emails
+    # Motor analítico recarregado: o dashboard já conta os importados
+    assert client.get('/api/dashboard').get_json()['total_students'] == total + 3
+
+
+def test_import_ndjson_rejects_malformed_lines(client):
+    body = (
+        '{"name": "Linha Json", "email": "linha.json@email.com", "age": 10, "class": "6º Ano B"}\n'
+        '\n'
+        '{"name": "Quebrada",\n'
+        '{"name": "Sem Email", "age": 10, "class": "6º Ano B"}\n'
+    )
+    *rejected, summary = _import(client, body, 'application/x-ndjson')
+
+    assert summary['inserted'] == 1 and summary['invalid'] == 2
+    assert [(line['line'], line['status']) for line in rejected] == [(3, 'invalid'), (4, 'invalid')]
+    assert rejected[0]['message'] == 'Linha inválida'
+
+
+def test_import_requires_csv_or_ndjson(client):
+    response = client.post('/api/students/import', json=[{'name': 'x'}])
+    assert response.status_code == 415
@@ -0,0 +1,44 @@
+"""
+Paginação por cursor (keyset) com projeção de campos: ?fields=&limit=&cursor=
+"""
+
+
+def _all_pages(client, url, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = client.get(f'{url}{"&" if "?" in url else "?"}limit={limit}' + (f'&cursor={cursor}' if cursor else ''))
+        assert page.status_code == 200
+        body = page.get_json()
+        assert len(body['items']) <= limit
+        items += body['items']
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return items, pages
+
+
+def test_student_pages_follow_name_and_id_order(client):
+    # Nomes repetidos: o desempate da chave é o id
+    for email in ('homonimo.um@email.com', 'homonimo.dois@email.com', 'homonimo.tres@email.com'):
+        client.post('/api/students', json={'name': 'Aluno Homônimo', 'email': email, 'age': 11, 'class': '6º Ano B'})
+
+    everyone = client.get('/api/students').get_json()
+    expected = [s['id'] for s in sorted(everyone, key=lambda s: (s['name'], s['id']))]
+
+    items, pages = _all_pages(client, '/api/students?fields=id,name', 2)
+    assert [item['id'] for item in items] == expected
+    assert pages == -(-len(expected) // 2)
+    assert all(set(item) == {'id', 'name'} for item in items)
+
+
+def test_grade_pages_with_filter(client):
+    full = client.get('/api/grades?student_id=1').get_json()
+    items, _ = _all_pages(client, '/api/grades?student_id=1', 3)
+    assert sorted(item['id'] for item in items) == sorted(grade['id'] for grade in full)
+    assert len({item['id'] for item in items}) == len(items)
+
+
+def test_invalid_cursor_and_fields(client):
+    assert client.get('/api/students?limit=2&cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/students?fields=id,password').status_code == 400
+    assert client.get('/api/subjects?limit=2&cursor=WzFd').status_code == 400
@@ -0,0 +1,18 @@
+def test_only_writing_cursor_blocks_pin_the_session(app, monkeypatch):
+    from database import get_database
+
+    db = get_database()
+    marked = []
+    monkeypatch.setattr(db, '_mark_write', marked.append)
+
+    with db.cursor(dictionary=True) as cursor:
+        cursor.execute("SELECT id FROM students WHERE id = %s FOR UPDATE", (1,))
+        cursor.fetchall()
+    assert marked == []
+
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE students SET age = age WHERE id = %s", (1,))
+    assert len(marked) == 1
+
+    db.execute_query("SELECT 1")
+    assert len(marked) == 1
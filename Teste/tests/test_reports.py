@@ -0,0 +1,54 @@
+"""
+Relatórios por turma pelas consultas SQL (caminho sem o motor analítico)
+"""
+
+
+def test_class_queries_match_school_queries(app):
+    from av1.models import Reports, Subject
+    from database import get_database
+
+    db = get_database()
+    classes = Reports.get_classes()
+    assert classes
+
+    school = Reports.build_general_stats(db.fetch_query(Reports.GENERAL_STATS_QUERY))
+    assert Reports.merge_general_stats([Reports.general_stats_partition(c) for c in classes]) == school
+
+    by_class = [row for c in classes for row in Reports.class_report_partition(c)]
+    assert by_class == Reports.build_class_report(db.fetch_query(Reports.CLASS_STATS_QUERY))
+
+    subjects = Subject.get_all()
+    for student_class in classes:
+        report = Reports.student_report_partition(student_class, subjects)
+        assert report and {entry['class'] for entry in report} == {student_class}
+    parts = [Reports.student_report_partition(c, subjects) for c in classes]
+    everyone = list(Reports.group_student_report(db.fetch_query(Reports.STUDENT_REPORT_QUERY), subjects))
+    assert Reports.merge_student_report(db, parts) == everyone
+
+
+def test_process_workers_fall_back_to_threads_for_models_loaded_from_file(app):
+    # av1.models vem de av1/av1/av1.models.py: um processo novo importaria o marcador
+    from av1.models import Reports
+    from workers import ReportExecutor
+
+    executor = ReportExecutor(workers=2, kind='process')
+    try:
+        classes = Reports.get_classes()
+        assert executor.map(Reports.general_stats_partition, classes) == \
+            [Reports.general_stats_partition(c) for c in classes]
+        assert executor.stats()['fallbacks'] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_process_workers_run_importable_tasks(app):
+    from database import normalize_sql
+    from workers import ReportExecutor
+
+    queries = ["SELECT * FROM grades WHERE id = 1", "SELECT name FROM students WHERE class = 'A'"]
+    executor = ReportExecutor(workers=2, kind='process')
+    try:
+        assert executor.map(normalize_sql, queries) == [normalize_sql(q) for q in queries]
+        assert executor.stats()['fallbacks'] == 0
+    finally:
+        executor.shutdown()
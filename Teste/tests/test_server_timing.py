@@ -0,0 +1,26 @@
+"""
+Cabeçalho Server-Timing: tempos e contagens sempre, SQL só quando pedido
+"""
+
+
+def _slowest(response):
+    entries = [part.strip() for part in response.headers['Server-Timing'].split(',')]
+    return next(entry for entry in entries if entry.startswith('db-slowest'))
+
+
+def test_server_timing_omits_sql_by_default(app, client):
+    response = client.get('/api/students')
+    assert response.status_code == 200
+    slowest = _slowest(response)
+    assert 'dur=' in slowest
+    assert 'desc' not in slowest
+    assert 'SELECT' not in response.headers['Server-Timing'].upper()
+
+
+def test_server_timing_includes_sql_in_debug(app, client):
+    app.debug = True
+    try:
+        response = client.get('/api/students')
+    finally:
+        app.debug = False
+    assert 'SELECT' in _slowest(response).upper()
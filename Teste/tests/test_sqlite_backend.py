@@ -0,0 +1,22 @@
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+
+
+def test_sqlite_types_are_scoped_to_the_backend(app):
+    from database import get_database
+
+    # Outras conexões sqlite3 do processo não são afetadas pelo backend
+    other = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+    other.execute("CREATE TABLE t (value REAL)")
+    other.execute("INSERT INTO t VALUES (7.5)")
+    assert type(other.execute("SELECT value FROM t").fetchone()[0]) is float
+    assert 'REAL' not in sqlite3.converters
+    assert (Decimal, sqlite3.PrepareProtocol) not in sqlite3.adapters
+    other.close()
+
+    # As do backend devolvem os tipos do MySQL e aceitam Decimal como parâmetro
+    db = get_database()
+    row = db.fetch_query("SELECT grade, created_at FROM grades WHERE grade >= %s LIMIT 1", (Decimal('0.0'),))[0]
+    assert isinstance(row['grade'], Decimal)
+    assert isinstance(row['created_at'], datetime)
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def test_create_student_updates_analytics(client):
+    from analytics import analytics
+
+    dashboard = client.get('/api/dashboard').get_json()
+    assert analytics.enabled and analytics.stats()['loaded']
+    classes = {row['class']: row['total_students'] for row in client.get('/api/reports/classes').get_json()}
+
+    response = client.post('/api/students', json={
+        'name': 'Zeca Teste', 'email': 'zeca.teste@email.com', 'age': 12, 'class': '6º Ano A'
+    })
+    assert response.status_code == 201
+    student_id = response.get_json()['id']
+
+    assert client.get('/api/dashboard').get_json()['total_students'] == dashboard['total_students'] + 1
+    after = {row['class']: row['total_students'] for row in client.get('/api/reports/classes').get_json()}
+    assert after['6º Ano A'] == classes.get('6º Ano A', 0) + 1
+    assert student_id in [row['id'] for row in client.get('/api/reports/students').get_json()]
+
+
+def test_create_student_duplicate_email(client):
+    data = {'name': 'Zeca Dois', 'email': 'joao@email.com', 'age': 12, 'class': '6º Ano A'}
+    response = client.post('/api/students', json=data)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Email já está em uso'
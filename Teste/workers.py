@@ -0,0 +1,147 @@
+import importlib.machinery
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from dotenv import load_dotenv
+from database import get_database, reset_database
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+
+def _run_partition(task, item):
+    """Executa uma partição e devolve ao pool a conexão usada pelo worker"""
+    started = time.perf_counter()
+    try:
+        return task(item), time.perf_counter() - started
+    finally:
+        db = get_database()
+        if db:
+            db.release_connection()
+
+
+def _importable(task):
+    """Indica se um processo novo encontra task pelo nome do seu módulo. Módulos
+    carregados de outro arquivo (av1.models a partir de av1/av1/av1.models.py)
+    resolveriam, no filho, para o arquivo do nome (o marcador av1/models.py)."""
+    while isinstance(task, partial):
+        task = task.func
+    module = sys.modules.get(getattr(task, '__module__', None) or '')
+    if module is None:
+        return False
+    path = getattr(module, '__file__', None)
+    if path is None or module.__name__ == '__main__':
+        # Embutidos; __main__ é recarregado pelo próprio multiprocessing
+        return True
+
+    parent = module.__name__.rpartition('.')[0]
+    search = getattr(sys.modules.get(parent), '__path__', None) if parent else None
+    spec = importlib.machinery.PathFinder.find_spec(module.__name__, search)
+    return bool(spec and spec.origin) and os.path.realpath(spec.origin) == os.path.realpath(path)
+
+
+class ReportExecutor:
+    """Pool de workers (threads ou processos) para relatórios particionados.
+    Cada partição usa a sua própria conexão do pool: a da thread do worker
+    ou, em processos, a de um pool criado no próprio processo filho.
+
+    Os processos são criados com REPORT_START_METHOD (spawn por padrão: um fork
+    do servidor, que já tem threads, pode herdar locks presos). Tarefas cujo
+    módulo um processo novo não importaria pelo nome rodam em threads."""
+
+    def __init__(self, workers=None, kind=None, start_method=None):
+        self.workers = workers or int(os.getenv('REPORT_WORKERS', min(4, os.cpu_count() or 1)))
+        self.kind = kind or os.getenv('REPORT_EXECUTOR', 'thread')
+        if self.kind not in ('thread', 'process'):
+            raise ValueError(f"REPORT_EXECUTOR inválido: {self.kind} (use thread ou process)")
+        self.start_method = start_method or os.getenv('REPORT_START_METHOD', 'spawn')
+
+        self._executors = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'runs': 0,
+            'partitions': 0,
+            'partition_time': 0.0,
+            'wall_time': 0.0,
+            'fallbacks': 0
+        }
+
+    @property
+    def parallel(self):
+        return self.workers > 1
+
+    def _get_executor(self, kind):
+        executor = self._executors.get(kind)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(kind)
+                if executor is None:
+                    if kind == 'process':
+                        executor = ProcessPoolExecutor(self.workers, initializer=reset_database,
+                                                       mp_context=multiprocessing.get_context(self.start_method))
+                    else:
+                        executor = ThreadPoolExecutor(self.workers, thread_name_prefix='report')
+                    self._executors[kind] = executor
+        return executor
+
+    def _kind_for(self, task):
+        if self.kind != 'process' or _importable(task):
+            return self.kind
+        with self._lock:
+            self._stats['fallbacks'] += 1
+            if self._stats['fallbacks'] == 1:
+                name = getattr(task, 'func', task)
+                print(f"Relatórios em threads: {name.__module__}.{name.__qualname__} "
+                      f"não é importável em um processo novo")
+        return 'thread'
+
+    def map(self, task, items):
+        """Executa task(item) para cada partição e retorna os resultados na ordem de items.
+        Em modo process, task precisa ser uma função importável (serializável);
+        se não for, as partições rodam em threads."""
+        items = list(items)
+        started = time.perf_counter()
+        if not self.parallel or len(items) < 2:
+            outcomes = []
+            for item in items:
+                item_started = time.perf_counter()
+                outcomes.append((task(item), time.perf_counter() - item_started))
+        else:
+            executor = self._get_executor(self._kind_for(task))
+            futures = [executor.submit(_run_partition, task, item) for item in items]
+            outcomes = [future.result() for future in futures]
+
+        with self._lock:
+            self._stats['runs'] += 1
+            self._stats['partitions'] += len(items)
+            self._stats['partition_time'] += sum(elapsed for _, elapsed in outcomes)
+            self._stats['wall_time'] += time.perf_counter() - started
+        return [result for result, _ in outcomes]
+
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown()
+
+    def stats(self):
+        """Contadores para /api/health (tempo somado das partições vs. tempo de parede)"""
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'start_method': self.start_method if self.kind == 'process' else None,
+                'workers': self.workers,
+                'runs': self._stats['runs'],
+                'partitions': self._stats['partitions'],
+                'partition_time': round(self._stats['partition_time'], 3),
+                'wall_time': round(self._stats['wall_time'], 3),
+                'fallbacks': self._stats['fallbacks']
+            }
+
+
+# Instância compartilhada pelos relatórios
+report_executor = ReportExecutor()